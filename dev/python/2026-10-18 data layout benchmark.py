@@ -0,0 +1,97 @@
+"""
+Compare the old data decoder (read everything, transpose, astype, then scale
+each channel) against the chunked channel-major decoder now used by pyABF.
+A large synthetic 8-channel ABF is created in a temporary folder.
+
+Peak memory is measured with tracemalloc (numpy reports its allocations to it)
+and the downstream test is a few per-channel numpy operations on every row.
+
+SAMPLE OUTPUT:
+    synthetic ABF: 8 channels, 8000000 points per channel (128.0 MB)
+    old decoder: load 1.488 sec, peak memory 416.0 MB, row ops 3.444 sec
+    new decoder: load 0.233 sec, peak memory 260.2 MB, row ops 0.676 sec
+"""
+
+import os
+import sys
+import struct
+import tempfile
+import time
+import tracemalloc
+PATH_HERE = os.path.abspath(os.path.dirname(__file__))
+PATH_SRC = os.path.abspath(PATH_HERE+"../../../src/")
+sys.path.insert(0, PATH_SRC)
+import pyabf
+import pyabf.abfWriter
+import numpy as np
+
+CHANNEL_COUNT = 8
+POINT_COUNT = 8_000_000
+
+
+def createSyntheticAbf(filePath):
+    """Create a small ABF1 header then replace its data with random values."""
+    pyabf.abfWriter.writeABF1(np.zeros((1, CHANNEL_COUNT)), filePath, 20_000,
+                              nADCNumChannels=CHANNEL_COUNT)
+    with open(filePath, 'r+b') as f:
+        f.seek(10)
+        f.write(struct.pack('i', POINT_COUNT * CHANNEL_COUNT))
+        f.seek(2048)
+        f.truncate()
+        values = np.random.randint(-32768, 32767, POINT_COUNT * CHANNEL_COUNT)
+        f.write(values.astype(np.int16).tobytes())
+
+
+def decodeOld(abf):
+    """The decoder used before data was stored channel-major."""
+    with open(abf.abfFilePath, 'rb') as fb:
+        fb.seek(abf.dataByteStart)
+        raw = np.fromfile(fb, dtype=np.int16, count=abf.dataPointCount)
+    raw = np.reshape(raw, (abf.dataPointCount // abf.channelCount,
+                           abf.channelCount))
+    raw = np.transpose(raw)
+    data = raw.astype(np.float32)
+    for i in range(abf.channelCount):
+        data[i] = np.multiply(data[i], abf._dataGain[i])
+        data[i] = np.add(data[i], abf._dataOffset[i])
+    return data
+
+
+def decodeNew(abf):
+    with open(abf.abfFilePath, 'rb') as fb:
+        abf._loadAndScaleData(fb)
+    return abf.data
+
+
+def benchmark(name, decoder, abf):
+    tracemalloc.start()
+    t1 = time.perf_counter()
+    data = decoder(abf)
+    loadTime = time.perf_counter() - t1
+    peakMemory = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+
+    t1 = time.perf_counter()
+    for i in range(3):
+        for row in data:
+            np.std(row)
+            np.diff(row)
+            np.max(row)
+    rowTime = time.perf_counter() - t1
+
+    print(f"{name}: load {loadTime:.03f} sec, " +
+          f"peak memory {peakMemory:.01f} MB, row ops {rowTime:.03f} sec")
+    return data
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        abfPath = os.path.join(folder, "synthetic.abf")
+        createSyntheticAbf(abfPath)
+        abf = pyabf.ABF(abfPath, loadData=False)
+        print(f"synthetic ABF: {abf.channelCount} channels, " +
+              f"{abf.sweepPointCount} points per channel " +
+              f"({abf.dataPointCount*2/1e6:.01f} MB)")
+        dataOld = benchmark("old decoder", decodeOld, abf)
+        dataNew = benchmark("new decoder", decodeNew, abf)
+        assert np.array_equal(dataOld, dataNew)
@@ -0,0 +1,46 @@
+"""
+Time a full setSweep() loop over synthetic ABFs with increasing numbers of
+sweeps. Epoch tables are cached per channel, so the time per sweep should
+stay constant as the sweep count grows. The uncached column rebuilds the
+epoch table on every call (the old behavior) to show the quadratic cost.
+
+SAMPLE OUTPUT:
+    sweeps    cached (ms/sweep)    uncached (ms/sweep)
+       100                0.022                  1.494
+       200                0.009                  3.420
+       400                0.007                  7.119
+       800                0.008                 14.386
+"""
+
+import os
+import sys
+import tempfile
+import time
+PATH_HERE = os.path.abspath(os.path.dirname(__file__))
+PATH_SRC = os.path.abspath(PATH_HERE+"../../../src/")
+sys.path.insert(0, PATH_SRC)
+import pyabf
+import pyabf.abfWriter
+import numpy as np
+
+
+def timeSweepLoop(abf, cached=True):
+    t1 = time.perf_counter()
+    for sweep in abf.sweepList:
+        if not cached:
+            abf._epochTables.clear()
+        abf.setSweep(sweep)
+    return (time.perf_counter() - t1) / abf.sweepCount * 1000
+
+
+if __name__ == "__main__":
+    print("sweeps    cached (ms/sweep)    uncached (ms/sweep)")
+    with tempfile.TemporaryDirectory() as folder:
+        for sweepCount in [100, 200, 400, 800]:
+            abfPath = os.path.join(folder, f"sweeps{sweepCount}.abf")
+            sweeps = np.random.random((sweepCount, 200))
+            pyabf.abfWriter.writeABF1(sweeps, abfPath, 20_000)
+            abf = pyabf.ABF(abfPath)
+            cached = timeSweepLoop(abf, True)
+            uncached = timeSweepLoop(abf, False)
+            print(f"{sweepCount:6d}    {cached:17.03f}    {uncached:19.03f}")
@@ -0,0 +1,59 @@
+"""
+Measure how long it takes to load a large gap-free ABF using different
+numbers of decoding threads. A synthetic 2-channel ABF is created in a
+temporary folder and read once before timing so it is in the OS file cache.
+
+SAMPLE OUTPUT (from a single-core machine, so threads cannot help here):
+    synthetic ABF: 2 channels, 100000000 points per channel (400.0 MB)
+    1 decode threads: 1.105 sec
+    2 decode threads: 1.030 sec
+    4 decode threads: 1.078 sec
+    8 decode threads: 1.981 sec
+    16 decode threads: 1.392 sec
+"""
+
+import os
+import sys
+import struct
+import tempfile
+import time
+PATH_HERE = os.path.abspath(os.path.dirname(__file__))
+PATH_SRC = os.path.abspath(PATH_HERE+"../../../src/")
+sys.path.insert(0, PATH_SRC)
+import pyabf
+import pyabf.abfWriter
+import numpy as np
+
+CHANNEL_COUNT = 2
+POINT_COUNT = 100_000_000
+
+
+def createSyntheticAbf(filePath):
+    """Create a small ABF1 header then replace its data with random values."""
+    pyabf.abfWriter.writeABF1(np.zeros((1, CHANNEL_COUNT)), filePath, 20_000,
+                              nADCNumChannels=CHANNEL_COUNT)
+    with open(filePath, 'r+b') as f:
+        f.seek(10)
+        f.write(struct.pack('i', POINT_COUNT * CHANNEL_COUNT))
+        f.seek(2048)
+        f.truncate()
+        for i in range(CHANNEL_COUNT):
+            values = np.random.randint(-32768, 32767, POINT_COUNT)
+            f.write(values.astype(np.int16).tobytes())
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        abfPath = os.path.join(folder, "synthetic.abf")
+        createSyntheticAbf(abfPath)
+        abf = pyabf.ABF(abfPath, loadData=False)
+        print(f"synthetic ABF: {abf.channelCount} channels, " +
+              f"{abf.sweepPointCount} points per channel " +
+              f"({abf.dataPointCount*2/1e6:.01f} MB)")
+        abf.data  # warm up the file cache
+        for threads in [1, 2, 4, 8, 16]:
+            t1 = time.perf_counter()
+            abf = pyabf.ABF(abfPath, decodeThreads=threads)
+            elapsed = time.perf_counter() - t1
+            print(f"{threads} decode threads: {elapsed:.03f} sec")
+            del abf
@@ -12,6 +12,7 @@ import os
 
 from pyabf.abf import ABF
 from pyabf.atf import ATF
+from pyabf.cache import openCached
 
 def info():
     """display information about the pyabf package."""
@@ -8,10 +8,18 @@ are to be written in another file and imported as necessary.
 """
 
 from io import BufferedReader
+import contextlib
+import warnings
 import pathlib
 from pyabf.abf2.dataSection import DataSection
 import pyabf.abfWriter
+import pyabf.archive
+import pyabf.dataCache
+import pyabf.dataReader
+import pyabf.sharedData
 import pyabf.stimulus
+import pyabf.sweepView
+import pyabf.timeAxis
 
 from pyabf.abf2.stringsSection import StringsSection
 from pyabf.abf2.tagSection import TagSection
@@ -28,11 +36,16 @@ from pyabf.abf1.headerV1 import HeaderV1
 from pyabf.tools.abfHeaderDisplay import abfInfoPage
 
 import os
+import struct
 import time
+import threading
+import collections
+import concurrent.futures
 import numpy as np
 from pathlib import PureWindowsPath
 import hashlib
-from typing import Union, List, Tuple
+import pickle
+from typing import Union, List, Tuple, Iterator, BinaryIO
 
 
 class ABF:
@@ -49,19 +62,31 @@ class ABF:
     """
 
     def __init__(self,
-                 abfFilePath: Union[str, pathlib.Path],
+                 abfFilePath: Union[str, pathlib.Path, bytes, memoryview, BinaryIO],
                  loadData: bool = True,
                  cacheStimulusFiles: bool = True,
-                 stimulusFileFolder: bool = None):
+                 stimulusFileFolder: bool = None,
+                 dataMode: str = "memory",
+                 channels: List[int] = None,
+                 dtype: type = np.float32,
+                 decodeThreads: int = 1,
+                 dataCacheFolder: Union[str, pathlib.Path] = None):
         """
         Load header and sweep data from an ABF file.
 
         ### Parameters
 
-        1. abfFilePath -- path to the ABF file.
+        1. abfFilePath -- path to the ABF file. The contents of an ABF file may also be given as
+        bytes (or a bytearray or memoryview) or a seekable binary file object (like io.BytesIO).
+        Buffers are read in place without being copied, and file objects are read when needed
+        (so they must stay open). ABFs opened this way have no abfFilePath (it is None).
+        ABFs inside zip or tar archives can be opened with paths like "day.zip::cell3_0001.abf"
+        (see ABF.fromArchive).
 
         2. loadData -- whether or not to load sweep data values from the file immediately on instantiation.
         Set this to False if you intent to iterate many ABF files rapidly and only inspect their headers.
+        When False, setSweep() reads only the bytes of the requested sweep from disk, and the full
+        data section is only loaded if abf.data (or getAllYs) is accessed.
 
         3. cacheStimulusFiles -- Some ABF files use a source ABF as a stimulus file to control its DAC.
         This module automatically loads the stimulus waveform from disk if it is available.
@@ -74,33 +99,110 @@ class ABF:
         The ABF header contains an absolute file path to the stimulus file used to control the DAC.
         If supplied, this path is used as an alternate search path to look for stimulus files with the same filename
         in the case the original path does not exist on the machine loading the ABF.
+
+        5. dataMode -- "memory" decodes the whole data section into abf.data when data is loaded.
+        "mmap" memory-maps the data section instead and only scales the samples that are requested
+        (by setSweep, getAllYs, or indexing abf.data), so reading one sweep of a very large file
+        costs memory proportional to the sweep rather than the file. Data loaded this way is read-only.
+
+        6. channels -- list of ADC channels to decode (default is all channels). Only these channels
+        are pulled out of the interleaved data and scaled, and abf.data will only hold rows for them
+        (in the order listed by abf.dataChannels). Other channels cannot be used with setSweep().
+
+        7. dtype -- type of values in abf.data and sweepY: np.float32 (default), np.float64, or np.int16.
+        When np.int16 is used values are raw ADC counts which are never converted to floating point
+        (scale them with abf.dataGain and abf.dataOffset). Raw counts are always available from abf.getRawData().
+
+        8. decodeThreads -- number of threads used to convert and scale the data section when it is loaded.
+        Large files are split into chunks which are decoded in parallel directly into abf.data.
+
+        9. dataCacheFolder -- folder where decoded data is saved (as .npy files) so the next time this
+        file is loaded its data is memory-mapped from the cache instead of decoded again. Cache files
+        are specific to the file's GUID, size, and modification time (and the channels and dtype loaded).
+        Changes to abf.data are never written to the cache. Only used for ABFs read from a path with
+        dataMode="memory". The folder is limited to pyabf.dataCache.maxCacheBytes.
         """
 
         if (isinstance(abfFilePath, pathlib.Path)):
             abfFilePath = str(abfFilePath)
 
-        if abfFilePath.lower().endswith(".atf"):
+        # ABFs may be read from a path, a buffer, or a file object
+        self._sourceBuffer = None
+        self._sourceFile = None
+        self._sourceLock = threading.RLock()
+        self._fileHandle = None
+        self._closed = False
+        self._sharedMemory = None
+        self._ownsSharedMemory = False
+        abfName = abfFilePath
+        archiveMember = pyabf.archive.splitArchivePath(abfFilePath)
+        if archiveMember:
+            abfName = archiveMember[1]
+            abfFilePath = pyabf.archive.readMember(*archiveMember)
+        if isinstance(abfFilePath, (bytes, bytearray, memoryview)):
+            self._sourceBuffer = memoryview(abfFilePath).cast('B')
+            abfFilePath = None
+            if not archiveMember:
+                abfName = None
+        elif hasattr(abfFilePath, "read") and hasattr(abfFilePath, "seek"):
+            self._sourceFile = abfFilePath
+            abfName = getattr(abfFilePath, "name", None)
+            if not isinstance(abfName, str):
+                abfName = None
+            abfFilePath = abfName if abfName and os.path.isfile(abfName) else None
+        elif not isinstance(abfFilePath, str):
+            raise TypeError("ABF must be a path, bytes, or a binary file object")
+
+        if abfName and abfName.lower().endswith(".atf"):
             raise Exception("use pyabf.ATF (not pyabf.ABF) for ATF files")
 
-        if (os.path.isdir(abfFilePath)):
+        if abfFilePath and (os.path.isdir(abfFilePath)):
             raise Exception("path must be a path to a FILE not a FOLDER.")
 
+        if not dataMode in ["memory", "mmap"]:
+            raise ValueError("dataMode must be 'memory' or 'mmap'")
+
+        if not np.dtype(dtype) in [np.int16, np.float32, np.float64]:
+            raise ValueError("dtype must be np.int16, np.float32, or np.float64")
+
+        if decodeThreads < 1:
+            raise ValueError("decodeThreads must be at least 1")
+
         self._preLoadData = loadData
+        self._dataMode = dataMode
+        self._dataDtype = np.dtype(dtype)
+        self._decodeThreads = decodeThreads
+        self._dataCacheFolder = dataCacheFolder
+        self._data = None
+        self._dataModified = False  # True once abf.data differs from the file
+        self._epochTables = {}
         self._cacheStimulusFiles = cacheStimulusFiles
 
-        self.abfFilePath = os.path.abspath(abfFilePath)
-        self.abfFolderPath = os.path.dirname(self.abfFilePath)
+        self.abfFilePath = None
+        self.abfFolderPath = None
+        if abfFilePath:
+            self.abfFilePath = os.path.abspath(abfFilePath)
+            self.abfFolderPath = os.path.dirname(self.abfFilePath)
 
         if stimulusFileFolder:
             self.stimulusFileFolder = stimulusFileFolder
         else:
             self.stimulusFileFolder = self.abfFolderPath
 
-        if not os.path.exists(self.abfFilePath):
+        if self._isFromPath and not os.path.exists(self.abfFilePath):
             raise ValueError("ABF file does not exist: %s" % self.abfFilePath)
-        self.abfID = os.path.splitext(os.path.basename(self.abfFilePath))[0]
+        self.abfID = "ABF"
+        if abfName:
+            self.abfID = os.path.splitext(os.path.basename(abfName))[0]
+
+        if dataMode == "mmap" and self._sourceFile is not None:
+            try:
+                self._sourceFile.fileno()
+            except (AttributeError, OSError):
+                raise ValueError("dataMode='mmap' requires a path, a buffer, "
+                                 "or a file object with a file descriptor")
 
-        with open(self.abfFilePath, 'rb') as fb:
+        with self._openSource() as fb:
 
             # The first 4 bytes of the ABF indicates what type of file it is
             self.abfVersion = {}
@@ -118,6 +220,22 @@ class ABF:
             # create more local variables based on the header data
             self._makeAdditionalVariables()
 
+            # determine which channels will be decoded
+            if channels is None:
+                self.dataChannels = list(self.channelList)
+            else:
+                if len(channels) == 0:
+                    raise ValueError("at least one channel must be loaded")
+                for channel in channels:
+                    if not channel in self.channelList:
+                        msg = "Channel %d not available (must be 0 - %d)" % (
+                            channel, self.channelCount-1)
+                        raise ValueError(msg)
+                self.dataChannels = sorted(set(channels))
+
+            if self._dataDtype == np.int16 and self._dtype != np.int16:
+                raise ValueError("dtype=np.int16 requires an ABF with integer data")
+
             # note the file size
             fb.seek(0, os.SEEK_END)
             self._fileSize = fb.tell()
@@ -125,7 +243,180 @@ class ABF:
             # optionally load data from disk
             if self._preLoadData:
                 self._loadAndScaleData(fb)
-                self.setSweep(0)
+                self.setSweep(0, self.dataChannels[0])
+
+        # the file is not held open after the header is read (so many ABFs can be
+        # inspected at once) but is opened again by the first read which needs it
+        self._closeFileHandle()
+
+    @classmethod
+    def fromArchive(cls, archivePath: Union[str, pathlib.Path], memberName: str, **kwargs):
+        """
+        Open an ABF stored in a zip or tar archive without extracting it to disk.
+        Uncompressed members are memory-mapped in place (so headers and sweeps are
+        read directly from the archive) while compressed members are decompressed
+        into memory. Keyword arguments are passed to the ABF constructor.
+
+        ### Parameters
+        1. archivePath -- path to a zip or tar archive
+        2. memberName -- name of the ABF within the archive (e.g., "cell3_0001.abf")
+        """
+        archiveMemberPath = str(archivePath) + pyabf.archive.ARCHIVE_SEPARATOR + memberName
+        return cls(archiveMemberPath, **kwargs)
+
+    @classmethod
+    def follow(cls, abfFilePath: Union[str, pathlib.Path], channels: List[int] = None,
+               pollSec: float = 0.5, timeoutSec: float = None, **kwargs) -> Iterator[np.ndarray]:
+        """
+        Open an ABF which is still being recorded and yield its values (as scaled
+        (channels, points) arrays) from the start of the recording, then new values
+        as they are appended (see ABF.tail). Keyword arguments are passed to the
+        ABF constructor.
+
+        ### Parameters
+        1. abfFilePath -- path to the ABF file
+        2. channels -- list of channels to read (default is every channel)
+        3. pollSec -- time to wait between checks for new data
+        4. timeoutSec -- stop after this long without new data (default is to never stop)
+        """
+        with cls(abfFilePath, loadData=False, **kwargs) as abf:
+            yield from abf.tail(channels, pollSec, timeoutSec)
+
+    @property
+    def _isFromPath(self) -> bool:
+        """True if this ABF is read from a path (rather than a buffer or file object)."""
+        return self._sourceBuffer is None and self._sourceFile is None
+
+    @contextlib.contextmanager
+    def _openSource(self):
+        """
+        Open the source of this ABF (a path, buffer, or file object) for reading.
+        Files are opened once and the handle is kept (and reused by every read)
+        until close() is called. File handles are shared, so they are used by one
+        thread at a time.
+        """
+        if self._closed:
+            raise ValueError("I/O operation on a closed ABF")
+        if self._sourceBuffer is not None:
+            yield pyabf.dataReader.BufferFile(self._sourceBuffer)
+        elif self._sourceFile is not None:
+            with self._sourceLock:
+                yield self._sourceFile
+        elif not self.abfFilePath:
+            raise ValueError("this ABF has no file to read from")
+        else:
+            with self._sourceLock:
+                if self._fileHandle is None:
+                    self._fileHandle = open(self.abfFilePath, 'rb')
+                yield self._fileHandle
+
+    def _closeFileHandle(self):
+        """Close the file handle opened by this ABF (if any)."""
+        with self._sourceLock:
+            if self._fileHandle is not None:
+                self._fileHandle.close()
+                self._fileHandle = None
+
+    def close(self) -> None:
+        """
+        Release the file (or buffer) this ABF reads from. Data already loaded into
+        memory (abf.data and the current sweep) remains available, but anything
+        which must be read from the file (lazy sweeps, memory-mapped data, md5,
+        etc.) raises a ValueError. File objects passed to the constructor are not
+        closed (they belong to the caller). Closing an ABF more than once is allowed.
+        """
+        self._closeFileHandle()
+        self._closed = True
+        self._sourceBuffer = None
+        self._sourceFile = None
+        if self._dataMode == "mmap":
+            self._data = None
+        if self._sharedMemory is not None:
+            self._data = None
+            self._sweepY = None
+            pyabf.sharedData.releaseSharedMemory(
+                self._sharedMemory, unlink=self._ownsSharedMemory)
+            self._sharedMemory = None
+
+    def toSharedMemory(self) -> pyabf.sharedData.SharedDataHandle:
+        """
+        Move abf.data into a shared memory block and return a small handle which
+        other processes use to create an ABF sharing this data (handle.attach())
+        rather than decoding the file again. This ABF uses the shared data too.
+        The block is removed when this ABF is closed, so keep it open until
+        other processes are finished with the data.
+        """
+        if self._sharedMemory is None:
+            self._sharedMemory, self._data = pyabf.sharedData.createSharedMemory(
+                np.asarray(self.data))
+            self._ownsSharedMemory = True
+
+            # shared data is an array in memory even if the file was memory-mapped
+            self._dataMode = "memory"
+            if not getattr(self, "_sweepBaselineSubtracted", False):
+                self._sweepY = None
+
+        # attached ABFs get their data from the block, so their source is not sent
+        abfState = pickle.dumps((type(self), self._headerState()))
+        return pyabf.sharedData.SharedDataHandle(
+            self._sharedMemory.name, self._data.shape, self._data.dtype, abfState)
+
+    def __getstate__(self):
+        """
+        Return the state of this ABF for pickling. Only header values, options,
+        and the current sweep number are kept (not data, which is read from the
+        file again when it is used), so sending an ABF to another process costs
+        kilobytes rather than the size of its data. ABFs read from a buffer
+        include a copy of it, and ABFs read from file objects cannot be pickled
+        unless the file object has the path of a file. Changes made to abf.data
+        (e.g., filtering) are not pickled. Closed ABFs read from a path can read
+        their file again once unpickled.
+        """
+        if self._sourceFile is not None and not self.abfFilePath:
+            raise TypeError("ABFs read from file objects cannot be pickled")
+        state = self._headerState()
+        state["_dataModified"] = False
+        if self._sourceBuffer is not None:
+            state["_sourceBuffer"] = bytes(self._sourceBuffer)
+        return state
+
+    def _headerState(self) -> dict:
+        """Return the state of this ABF without its data or the buffer or file it reads from."""
+        state = self.__dict__.copy()
+        for name in ["_data", "_sweepX", "_fileHandle",
+                     "_sourceLock", "_epochTables", "_sharedMemory",
+                     "_ownsSharedMemory", "stimulusByChannel", "_closed"]:
+            state.pop(name, None)
+        if not getattr(self, "_sweepBaselineSubtracted", False):
+            state.pop("_sweepY", None)
+        state["_sourceFile"] = None
+        state["_sourceBuffer"] = None
+        return state
+
+    def __setstate__(self, state: dict):
+        """Restore a pickled ABF. Data will be read from its file when it is used."""
+        self.__dict__.update(state)
+        self._closed = False
+        self._data = None
+        self._epochTables = {}
+        self._fileHandle = None
+        self._sourceLock = threading.RLock()
+        self._sharedMemory = None
+        self._ownsSharedMemory = False
+        if self._sourceBuffer is not None:
+            self._sourceBuffer = memoryview(self._sourceBuffer).cast('B')
+        self.stimulusByChannel = [pyabf.stimulus.Stimulus(self, channel)
+                                  for channel in self.channelList]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def __del__(self):
+        if getattr(self, "_fileHandle", None) is not None:
+            self._fileHandle.close()
 
     def __str__(self):
         """
@@ -424,6 +715,9 @@ class ABF:
             if self.sweepIntervalSec == 0:
                 self.sweepIntervalSec = self.sweepLengthSec
 
+        # locate every sweep in the data section
+        self._indexSweeps()
+
         # determine total ABF recording length
         self.dataLengthSec = self.sweepIntervalSec*self.sweepCount
         if self.sweepCount > 1:
@@ -463,25 +757,81 @@ class ABF:
         else:
             raise NotImplementedError("unknown data format")
 
+    def _indexSweeps(self):
+        """
+        Determine the first point, number of points, and start time of every
+        sweep once so sweeps can be located in constant time by setSweep().
+        """
+
+        # determine if this ABF uses variable-length sweeps
+        self._fixedLengthSweeps = True
+        if self.sweepCount > 1 and hasattr(self, "_synchArraySection"):
+            uniqueSweepLengths = set(self._synchArraySection.lLength)
+            self._fixedLengthSweeps = len(uniqueSweepLengths) <= 1
+
+        if self._fixedLengthSweeps:
+            sweepNumbers = np.arange(self.sweepCount, dtype=np.int64)
+            self._sweepPointCounts = np.full(
+                self.sweepCount, self.sweepPointCount, dtype=np.int64)
+            self._sweepPointStarts = sweepNumbers * self.sweepPointCount
+            self._sweepStartsSec = sweepNumbers * self.sweepIntervalSec
+        else:
+            lengths = np.array(self._synchArraySection.lLength, dtype=np.int64)
+            starts = np.array(self._synchArraySection.lStart, dtype=np.int64)
+            self._sweepPointCounts = lengths // self.channelCount
+            self._sweepPointStarts = np.zeros(len(lengths), dtype=np.int64)
+            np.cumsum(self._sweepPointCounts[:-1],
+                      out=self._sweepPointStarts[1:])
+            self._sweepStartsSec = starts / self.dataRate
+
     def _loadAndScaleData(self, fb: BufferedReader):
         """Load data from the ABF file and scale it by its scaleFactor."""
 
-        # read the data from the ABF file
-        fb.seek(self.dataByteStart)
-        raw = np.fromfile(fb, dtype=self._dtype, count=self.dataPointCount)
-        nRows = self.channelCount
-        nCols = int(self.dataPointCount/self.channelCount)
-        raw = np.reshape(raw, (nCols, nRows))
-        raw = np.transpose(raw)
-
-        # if data is int, scale it to float32 so we can scale it
-        self.data = raw.astype(np.float32)
+        self._dataModified = False
+        if self._dataMode == "mmap":
+            self._mapData()
+            return
 
-        # if the data was originally an int, it must be scaled
-        if self._dtype == np.int16:
-            for i in range(self.channelCount):
-                self.data[i] = np.multiply(self.data[i], self._dataGain[i])
-                self.data[i] = np.add(self.data[i], self._dataOffset[i])
+        # use previously decoded data if it is in the cache
+        pointCount = int(self.dataPointCount/self.channelCount)
+        cacheFilePath = None
+        if self._dataCacheFolder and self._isFromPath:
+            cacheFilePath = pyabf.dataCache.cacheFilePath(
+                str(self._dataCacheFolder), self)
+            cachedData = pyabf.dataCache.load(
+                cacheFilePath, (len(self.dataChannels), pointCount), self._dataDtype)
+            if cachedData is not None:
+                self._data = cachedData
+                return
+
+        # read the data from the ABF file (de-interleaving and scaling it)
+        self._data = pyabf.dataReader.decodeData(
+            fb, self.dataByteStart, self._dtype, self.channelCount,
+            pointCount, self.dataChannels, self._dataGain, self._dataOffset,
+            self._dataDtype, self._decodeThreads)
+
+        if cacheFilePath:
+            try:
+                pyabf.dataCache.save(cacheFilePath, self._data)
+            except OSError as e:
+                # the data was decoded, it just can't be reused next time
+                warnings.warn("could not save decoded data to the cache: %s" % e)
+
+    def _mapData(self):
+        """Memory-map the data section so values are scaled only when accessed."""
+        pointCount = int(self.dataPointCount/self.channelCount)
+        shape = (pointCount, self.channelCount)
+        if self._sourceBuffer is not None:
+            raw = np.frombuffer(self._sourceBuffer, dtype=self._dtype,
+                                count=pointCount*self.channelCount,
+                                offset=self.dataByteStart).reshape(shape)
+        else:
+            with self._openSource() as fb:
+                raw = np.memmap(fb, dtype=self._dtype, mode='r',
+                                offset=self.dataByteStart, shape=shape)
+        self._data = pyabf.dataReader.MappedData(
+            raw, self.dataChannels, self._dataGain, self._dataOffset,
+            self._dataDtype)
 
     def _ide_helper(self):
         """
@@ -496,6 +846,7 @@ class ABF:
         self.sweepLabelX = ""
         self.sweepLabelY = ""
         self.sweepLabelC = ""
+        self.sweepTimeAxis = pyabf.timeAxis.TimeAxis(0, 0)
         self.sweepX = np.array([])
         self.sweepY = np.array([])
         self.sweepEpochs = pyabf.waveform.EpochSweepWaveform()
@@ -549,10 +900,7 @@ class ABF:
             filePath = str(filePath)
 
         filePath = os.path.abspath(filePath)
-        sweepData = np.empty((self.sweepCount, self.sweepPointCount))
-        for sweep in self.sweepList:
-            self.setSweep(sweep)
-            sweepData[sweep] = self.sweepY
+        sweepData = self.getSweeps().astype(np.float64)
         pyabf.abfWriter.writeABF1(sweepData, filePath, self.dataRate)
 
     def launchInClampFit(self) -> None:
@@ -590,72 +938,23 @@ class ABF:
         """
 
         # basic error checking
-        if not sweepNumber in self.sweepList:
-            msg = "Sweep %d not available (must be 0 - %d)" % (
-                sweepNumber, self.sweepCount-1)
-            raise ValueError(msg)
-        if not channel in self.channelList:
-            msg = "Channel %d not available (must be 0 - %d)" % (
-                channel, self.channelCount-1)
-            raise ValueError(msg)
-
-        if not "data" in (dir(self)):
-            with open(self.abfFilePath, 'rb') as fb:
-                self._loadAndScaleData(fb)
-
-        adcName, adcUnits = self._getAdcNameAndUnits(channel)
-        dacName, dacUnits = self._getDacNameAndUnits(channel)
+        self._checkSweepAndChannel(sweepNumber, channel)
 
         # sweep information
         self.sweepNumber = sweepNumber
         self.sweepChannel = channel
-        self.sweepUnitsY = adcUnits
-        self.sweepUnitsC = dacUnits
         self.sweepUnitsX = "sec"
-
-        # standard labels
-        self.sweepLabelY = f"{adcName} ({adcUnits})"
-        self.sweepLabelC = f"{dacName} ({dacUnits})"
         self.sweepLabelX = "Time (seconds)"
         self.sweepLabelD = "Digital Output (V)"
+        self.sweepUnitsY, self.sweepUnitsC, self.sweepLabelY, self.sweepLabelC = \
+            self._getSweepUnitsAndLabels(channel)
 
-        # use fancy labels for known units
-        if self.sweepUnitsY == "pA":
-            self.sweepLabelY = "Clamp Current (pA)"
-            self.sweepLabelC = "Membrane Potential (mV)"
-        elif self.sweepUnitsY == "mV":
-            self.sweepLabelY = "Membrane Potential (mV)"
-            self.sweepLabelC = "Applied Current (pA)"
-
-        # determine if this ABF uses variable-length sweeps
-        hasMultipleSweeps = self.sweepCount > 1
-        if hasMultipleSweeps and hasattr(self, "_synchArraySection"):
-            uniqueSweepLengths = set(self._synchArraySection.lLength)
-            isFixedLengthSweeps = len(uniqueSweepLengths) == 1
-        else:
-            isFixedLengthSweeps = True
-
-        # determine data bounds for this sweep
-        if (isFixedLengthSweeps):
-            pointStart = self.sweepPointCount*sweepNumber
-            pointCount = self.sweepPointCount
-        else:
-            pointStart = 0
-            for i in range(sweepNumber):
-                pointStart += self._synchArraySection.lLength[i]//self.channelCount
-            pointCount = self._synchArraySection.lLength[sweepNumber]//self.channelCount
-        pointEnd = pointStart + pointCount
-
-        # load the actual sweep data
-        self.sweepY = self.data[channel, pointStart:pointEnd]
-        self.sweepX = np.arange(len(self.sweepY))*self.dataSecPerPoint
+        # load the actual sweep data (reading just this sweep if data isn't loaded)
+        self.sweepY = self._getSweepValues(sweepNumber, channel)
+        self.sweepTimeAxis = pyabf.timeAxis.TimeAxis(len(self.sweepY), self.dataSecPerPoint)
         if absoluteTime:
-            if isFixedLengthSweeps:
-                self.sweepX += sweepNumber * self.sweepIntervalSec
-            else:
-                sweepOffsetPoints = self._synchArraySection.lStart[sweepNumber]
-                sweepOffsetSec = sweepOffsetPoints / self.dataRate
-                self.sweepX += sweepOffsetSec
+            self.sweepTimeAxis += self._sweepStartsSec[sweepNumber]
+        self._sweepX = None
 
         # default case is disabled
         if not hasattr(self, '_sweepBaselinePoints'):
@@ -663,22 +962,341 @@ class ABF:
 
         # if baseline subtraction is used, apply it
         assert isinstance(baseline, list) and len(baseline) == 2
-        if not None in baseline:
+        self._sweepBaselineSubtracted = not None in baseline
+        if self._sweepBaselineSubtracted:
             pt1, pt2 = [int(x*self.dataRate) for x in baseline]
             blVal = np.average(self.sweepY[pt1:pt2])
             self.sweepY = self.sweepY-blVal
 
         # make sure sweepPointCount is always accurate
-        if isFixedLengthSweeps:
+        if self._fixedLengthSweeps:
             assert (self.sweepPointCount == len(self.sweepY))
 
         # prepare the stimulus waveform table for this sweep/channel
+        self.sweepEpochs = self._getSweepEpochs(sweepNumber, channel)
+
+    def sweep(self, sweepNumber: int, channel: int = 0,
+              absoluteTime: bool = False) -> pyabf.sweepView.SweepView:
+        """
+        Return an immutable view of a sweep without changing the state of the ABF
+        (unlike setSweep). Values are shared with abf.data rather than copied, and
+        the command waveform, digital outputs, and epochs are only generated when
+        accessed. Multiple threads may create and use views of the same ABF.
+
+        ### Parameters
+        1. sweepNumber -- sweep number (starting at 0)
+        2. channel -- ABF channel (starting at 0)
+        3. absoluteTime -- Whether x should represent time in sweep or time in file.
+        """
+        self._checkSweepAndChannel(sweepNumber, channel)
+        return pyabf.sweepView.SweepView(self, sweepNumber, channel, absoluteTime)
+
+    def sweepAllChannels(self, sweepNumber: int,
+                         absoluteTime: bool = False) -> pyabf.sweepView.MultiChannelSweepView:
+        """
+        Return an immutable view of one sweep of every loaded channel (see
+        abf.dataChannels) with values as a (channels, points) array and lists of
+        units and labels for each channel. Values are shared with abf.data when
+        it is loaded, so paired recordings can be compared without copies.
+
+        ### Parameters
+        1. sweepNumber -- sweep number (starting at 0)
+        2. absoluteTime -- Whether x should represent time in sweep or time in file.
+        """
+        return pyabf.sweepView.MultiChannelSweepView(
+            self, sweepNumber, self.dataChannels, absoluteTime)
+
+    def iterSweeps(self, channel: int = 0, prefetch: int = 2,
+                   absoluteTime: bool = False) -> Iterator[pyabf.sweepView.SweepView]:
+        """
+        Yield a SweepView for every sweep (in order). If data has not been loaded
+        the next sweeps are read from disk on a background thread while the caller
+        processes the current one, overlapping file access with analysis.
+
+        ### Parameters
+        1. channel -- ABF channel (starting at 0)
+        2. prefetch -- number of sweeps to read ahead of the one being processed.
+            Use 0 to read each sweep only when it is needed.
+        3. absoluteTime -- Whether x should represent time in sweep or time in file.
+        """
+        self._checkSweepAndChannel(0, channel)
+
+        if self._data is not None or prefetch < 1:
+            for sweepNumber in range(self.sweepCount):
+                yield self.sweep(sweepNumber, channel, absoluteTime)
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            pending = collections.deque()
+            nextSweepNumber = 0
+            try:
+                while pending or nextSweepNumber < self.sweepCount:
+                    while nextSweepNumber < self.sweepCount and len(pending) <= prefetch:
+                        pending.append(executor.submit(
+                            pyabf.sweepView.SweepView, self, nextSweepNumber,
+                            channel, absoluteTime))
+                        nextSweepNumber += 1
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def mapSweeps(self, func, channels: Union[int, List[int]] = None,
+                  workers: int = None, executor: str = "thread") -> list:
+        """
+        Call a function with the values of every sweep and return a list of the
+        results (in sweep order). Sweeps are processed in parallel by a pool of
+        workers. Threads are given views of abf.data (or read their sweep from
+        disk if data has not been loaded). Processes are given the file path and
+        position of their sweep and read it themselves, so values are never pickled.
+        Process workers only see values stored in the file, so they cannot be used
+        once abf.data has been replaced or filtered. Changes made by assigning to
+        elements of abf.data cannot be detected and are ignored by process workers.
+
+        ### Parameters
+        1. func -- function called with the values of each sweep. If channels is a
+            single channel func gets a 1D array, otherwise a (channels, points) array.
+            For process workers func must be picklable (defined at module level).
+        2. channels -- channel or list of channels to pass to func
+            (default is every channel in abf.dataChannels)
+        3. workers -- number of threads or processes (default is chosen by Python)
+        4. executor -- "thread" or "process"
+        """
+        if not executor in ["thread", "process"]:
+            raise ValueError("executor must be 'thread' or 'process'")
+        squeeze = isinstance(channels, (int, np.integer))
+        if channels is None:
+            channels = self.dataChannels
+        elif squeeze:
+            channels = [channels]
+        channels = list(channels)
+        if squeeze:
+            rows = self._dataRow(channels[0])
+        else:
+            rows = self._dataRows(channels)
+
+        if executor == "process":
+            if self._closed or not self._isFromPath:
+                raise ValueError("process workers require an open ABF read from a path")
+            if self._dataModified:
+                raise ValueError("process workers read sweeps from the file and would "
+                                 "ignore changes to abf.data (use executor='thread')")
+            with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+                jobs = [pool.submit(
+                    pyabf.dataReader.applyToFile, func, squeeze,
+                    *self._decodeArgs(int(self._sweepPointStarts[sweepNumber]),
+                                      int(self._sweepPointCounts[sweepNumber]),
+                                      channels, self._dataDtype))
+                        for sweepNumber in range(self.sweepCount)]
+                return [job.result() for job in jobs]
+
+        def applyToSweep(sweepNumber):
+            pointStart = int(self._sweepPointStarts[sweepNumber])
+            pointCount = int(self._sweepPointCounts[sweepNumber])
+            if self._data is None:
+                values = self._decodePoints(pointStart, pointCount, channels)
+                return func(values[0] if squeeze else values)
+            return func(self.data[rows, pointStart:pointStart+pointCount])
+
+        with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+            return list(pool.map(applyToSweep, range(self.sweepCount)))
+
+    def tail(self, channels: List[int] = None, pollSec: float = 0.5,
+             timeoutSec: float = None, startSec: float = 0) -> Iterator[np.ndarray]:
+        """
+        Yield values as they are appended to an ABF which is still being recorded.
+        The length of the data section is re-read from the header (and limited to
+        the size of the file) every poll, and only new points are read from disk and
+        yielded as scaled (channels, points) arrays. The header of this ABF object is
+        not updated. This is intended for gap-free recordings.
+
+        ### Parameters
+        1. channels -- list of channels to read (default is every channel in abf.dataChannels)
+        2. pollSec -- time to wait between checks for new data
+        3. timeoutSec -- stop after this long without new data (default is to never stop)
+        4. startSec -- time of the first point to yield. Use abf.dataLengthSec to
+            skip data which was recorded before this ABF was opened.
+        """
+        if channels is None:
+            channels = self.dataChannels
+        channels = list(channels)
+        for channel in channels:
+            self._dataRow(channel)
+        pointByteSize = self.channelCount * self.dataPointByteSize
+        pointStart = max(0, int(round(startSec*self.dataRate)))
+        lastDataTime = time.perf_counter()
+
+        # buffered handles may return old header bytes, so files are read unbuffered
+        tailFile = None
+        if self._isFromPath and not self._closed:
+            tailFile = open(self.abfFilePath, 'rb', buffering=0)
+        try:
+            while True:
+                source = contextlib.nullcontext(tailFile) if tailFile else self._openSource()
+                with source as fb:
+                    pointCount = self._readRecordedPointCount(fb) - pointStart
+                    if pointCount > 0:
+                        byteStart = self.dataByteStart + pointStart*pointByteSize
+                        values = pyabf.dataReader.decodeData(
+                            fb, byteStart, self._dtype, self.channelCount,
+                            pointCount, channels, self._dataGain,
+                            self._dataOffset, self._dataDtype)
+                if pointCount > 0:
+                    pointStart += pointCount
+                    lastDataTime = time.perf_counter()
+                    yield values
+                elif timeoutSec is not None and time.perf_counter() - lastDataTime >= timeoutSec:
+                    return
+                else:
+                    time.sleep(pollSec)
+        finally:
+            if tailFile:
+                tailFile.close()
+
+    def _readRecordedPointCount(self, fb: BufferedReader) -> int:
+        """
+        Return the number of points (per channel) currently in the data section
+        according to the header, limited to the points which are fully written to the file.
+        """
+        if self.abfVersion["major"] == 1:
+            fb.seek(10)
+            valueCount = struct.unpack("i", fb.read(4))[0]
+        else:
+            valueCount = DataSection(fb)._entryCount
+        fb.seek(0, os.SEEK_END)
+        valuesInFile = (fb.tell() - self.dataByteStart) // self.dataPointByteSize
+        return max(0, min(valueCount, valuesInFile)) // self.channelCount
+
+    def _checkSweepAndChannel(self, sweepNumber: int, channel: int) -> None:
+        """Raise a ValueError if the sweep or channel cannot be accessed."""
+        if not sweepNumber in range(self.sweepCount):
+            msg = "Sweep %d not available (must be 0 - %d)" % (
+                sweepNumber, self.sweepCount-1)
+            raise ValueError(msg)
+        if not channel in self.channelList:
+            msg = "Channel %d not available (must be 0 - %d)" % (
+                channel, self.channelCount-1)
+            raise ValueError(msg)
+        if not channel in self.dataChannels:
+            msg = "Channel %d was not loaded (loaded channels: %s)" % (
+                channel, self.dataChannels)
+            raise ValueError(msg)
+
+    def _getSweepUnitsAndLabels(self, channel: int) -> Tuple[str, str, str, str]:
+        """Return ADC units, DAC units, ADC label, and DAC label for a channel."""
+        adcName, adcUnits = self._getAdcNameAndUnits(channel)
+        dacName, dacUnits = self._getDacNameAndUnits(channel)
+
+        # standard labels
+        labelY = f"{adcName} ({adcUnits})"
+        labelC = f"{dacName} ({dacUnits})"
+
+        # use fancy labels for known units
+        if adcUnits == "pA":
+            labelY = "Clamp Current (pA)"
+            labelC = "Membrane Potential (mV)"
+        elif adcUnits == "mV":
+            labelY = "Membrane Potential (mV)"
+            labelC = "Applied Current (pA)"
+
+        return adcUnits, dacUnits, labelY, labelC
+
+    def _getSweepValues(self, sweepNumber: int, channel: int) -> np.ndarray:
+        """
+        Return values of a sweep (a view of abf.data if data is loaded,
+        otherwise just this sweep is read from disk).
+        """
+        pointStart = int(self._sweepPointStarts[sweepNumber])
+        pointCount = int(self._sweepPointCounts[sweepNumber])
+        if self._data is None:
+            return self._decodePoints(pointStart, pointCount, [channel])[0]
+        pointEnd = pointStart + pointCount
+        return self.data[self._dataRow(channel), pointStart:pointEnd]
+
+    def _getSweepValuesOfChannels(self, sweepNumber: int, channels: List[int]) -> np.ndarray:
+        """Return a (channels, points) array of values of a sweep."""
+        for channel in channels:
+            self._checkSweepAndChannel(sweepNumber, channel)
+        pointStart = int(self._sweepPointStarts[sweepNumber])
+        pointCount = int(self._sweepPointCounts[sweepNumber])
+        if self._data is None:
+            return self._decodePoints(pointStart, pointCount, channels)
+        pointEnd = pointStart + pointCount
+        return self.data[self._dataRows(channels), pointStart:pointEnd]
+
+    def _getSweepEpochs(self, sweepNumber: int, channel: int) -> pyabf.waveform.EpochSweepWaveform:
+        """Return the epoch waveform of a sweep (or None if the channel has no DAC)."""
         if (channel < len(self.holdingCommand)):
-            epochTable = pyabf.waveform.EpochTable(self, channel)
-            self.sweepEpochs = epochTable.epochWaveformsBySweep[sweepNumber]
+            epochTable = self._getEpochTable(channel)
+            return epochTable.epochWaveformsBySweep[sweepNumber]
         else:
-            epochTable = None
-            self.sweepEpochs = None
+            return None
+
+    def _decodePoints(self, pointStart: int, pointCount: int,
+                      channels: List[int], dtype: type = None) -> np.ndarray:
+        """
+        Read a range of points for the given channels from disk (without loading
+        all data) and return it as a (channels, points) array.
+        """
+        if dtype is None:
+            dtype = self._dataDtype
+        byteStart = self.dataByteStart
+        byteStart += pointStart * self.channelCount * self.dataPointByteSize
+        with self._openSource() as fb:
+            return pyabf.dataReader.decodeData(
+                fb, byteStart, self._dtype, self.channelCount, pointCount,
+                channels, self._dataGain, self._dataOffset, dtype,
+                self._decodeThreads)
+
+    def _decodeArgs(self, pointStart: int, pointCount: int,
+                    channels: List[int], dtype: type) -> tuple:
+        """Return arguments for pyabf.dataReader.decodeFile() to read a range of points."""
+        byteStart = self.dataByteStart
+        byteStart += pointStart * self.channelCount * self.dataPointByteSize
+        return (self.abfFilePath, byteStart, self._dtype, self.channelCount,
+                pointCount, list(channels), self._dataGain, self._dataOffset,
+                dtype, self._decodeThreads)
+
+    def _dataRow(self, channel: int) -> int:
+        """Return the row of abf.data holding values for the given channel."""
+        if not channel in self.dataChannels:
+            msg = "Channel %d was not loaded (loaded channels: %s)" % (
+                channel, self.dataChannels)
+            raise ValueError(msg)
+        return self.dataChannels.index(channel)
+
+    def _dataRows(self, channels: List[int]) -> Union[slice, List[int]]:
+        """
+        Return an index for the rows of abf.data holding values for the given
+        channels. This is a slice (so indexing returns a view) when the rows are consecutive.
+        """
+        rows = [self._dataRow(channel) for channel in channels]
+        if rows and rows == list(range(rows[0], rows[-1] + 1)):
+            return slice(rows[0], rows[-1] + 1)
+        return rows
+
+    def _getEpochTable(self, channel: int) -> pyabf.waveform.EpochTable:
+        """
+        Return the epoch table for a channel. Tables are built once per channel
+        and only rebuilt if header values they depend on are changed.
+        """
+        headerValues = (self.dataRate, self.sweepPointCount, self.sweepCount,
+                        tuple(self.holdingCommand))
+        if channel in self._epochTables:
+            cachedHeaderValues, epochTable = self._epochTables[channel]
+            if cachedHeaderValues == headerValues:
+                return epochTable
+        epochTable = pyabf.waveform.EpochTable(self, channel)
+        self._epochTables[channel] = (headerValues, epochTable)
+        return epochTable
+
+    def _getSweepCommand(self, sweepNumber: int, channel: int, pointCount: int) -> np.ndarray:
+        """Return the command waveform of a sweep (trimmed to the given length)."""
+        stimulus = self.stimulusByChannel[channel]
+        stimulusWaveform = stimulus.stimulusWaveform(sweepNumber)
+        if len(stimulusWaveform) > pointCount:
+            stimulusWaveform = stimulusWaveform[:pointCount]
+        return stimulusWaveform
 
     def _getAdcNameAndUnits(self, adcIndex: int) -> Tuple[str, str]:
         if (adcIndex < len(self.adcNames)):
@@ -692,6 +1310,37 @@ class ABF:
         else:
             return [None, None]
 
+    @property
+    def sweepY(self) -> np.ndarray:
+        """
+        Values of the current sweep. These are read again from the file when first
+        accessed if they were not pickled with the ABF (see __getstate__).
+        """
+        if getattr(self, "_sweepY", None) is None:
+            if not hasattr(self, "sweepNumber"):
+                raise AttributeError("sweepY is not available until setSweep() is called")
+            self._sweepY = self._getSweepValues(self.sweepNumber, self.sweepChannel)
+        return self._sweepY
+
+    @sweepY.setter
+    def sweepY(self, values: np.ndarray):
+        self._sweepY = values
+
+    @property
+    def sweepX(self) -> np.ndarray:
+        """
+        Time of each point of the current sweep (seconds). Values are only
+        generated when first accessed. Use sweepTimeAxis to work with times
+        without generating an array.
+        """
+        if getattr(self, "_sweepX", None) is None:
+            self._sweepX = np.asarray(self.sweepTimeAxis)
+        return self._sweepX
+
+    @sweepX.setter
+    def sweepX(self, values: np.ndarray):
+        self._sweepX = values
+
     @property
     def sweepC(self) -> np.ndarray:
         """Generate the sweep command waveform."""
@@ -702,12 +1351,9 @@ class ABF:
             # auto-generate (or auto-load) the waveform using the stimulus module
             if not hasattr(self, 'sweepChannel'):
                 # call setsweep if it hasn't been called before
-                self.setSweep(0)
-            stimulus = self.stimulusByChannel[self.sweepChannel]
-            stimulusWaveform = stimulus.stimulusWaveform(self.sweepNumber)
-            if len(stimulusWaveform) > len(self.sweepX):
-                stimulusWaveform = stimulusWaveform[:len(self.sweepX)]
-            return stimulusWaveform
+                self.setSweep(0, self.dataChannels[0])
+            return self._getSweepCommand(
+                self.sweepNumber, self.sweepChannel, len(self.sweepY))
 
     @sweepC.setter
     def sweepC(self, sweepData=None):
@@ -731,11 +1377,50 @@ class ABF:
         assert isinstance(self, pyabf.ABF)
         if (self.sweepChannel >= len(self.holdingCommand)):
             return None
-        epochTable = pyabf.waveform.EpochTable(self, self.sweepChannel)
+        epochTable = self._getEpochTable(self.sweepChannel)
         sweepWaveform = epochTable.epochWaveformsBySweep[self.sweepNumber]
         sweepD = sweepWaveform.getDigitalWaveform(digOutNumber)
         return sweepD
 
+    @property
+    def data(self) -> np.ndarray:
+        """Scaled values for every channel (row) of the ABF. Data is read from disk when first accessed."""
+        if self._data is None:
+            with self._openSource() as fb:
+                self._loadAndScaleData(fb)
+        return self._data
+
+    @data.setter
+    def data(self, values: np.ndarray):
+        self._data = values
+        self._dataModified = True
+
+    def getRawData(self) -> np.ndarray:
+        """
+        Return values for every channel (row) exactly as they are stored in the file
+        (int16 ADC counts for most ABFs). Multiply by dataGain and add dataOffset
+        to convert counts to the units of each channel. Unless abf.data already
+        holds raw values the data section is decoded again (and not kept) each call.
+        """
+        if self._dataDtype == np.int16 and self._dataMode == "memory":
+            return self.data
+        if self._dataMode == "mmap":
+            return pyabf.dataReader.MappedData(
+                self.data._raw, self.dataChannels, self._dataGain,
+                self._dataOffset, self._dtype)
+        pointCount = int(self.dataPointCount/self.channelCount)
+        return self._decodePoints(0, pointCount, self.dataChannels, self._dtype)
+
+    @property
+    def dataGain(self) -> np.ndarray:
+        """Multiplier used to convert raw ADC counts to channel units (one per channel)"""
+        return np.array(self._dataGain, dtype=np.float64)
+
+    @property
+    def dataOffset(self) -> np.ndarray:
+        """Value added to scaled ADC counts to obtain channel units (one per channel)"""
+        return np.array(self._dataOffset, dtype=np.float64)
+
     @property
     def sweepTimesSec(self) -> np.ndarray:
         """Numpy array of sweep start times (in seconds)"""
@@ -762,7 +1447,8 @@ class ABF:
     def md5(self) -> str:
         """MD5 hash string of the whole ABF file."""
         if not hasattr(self, "_md5"):
-            with open(self.abfFilePath, 'rb') as f:
+            with self._openSource() as f:
+                f.seek(0)
                 hasher = hashlib.md5(f.read())
                 self._md5 = hasher.hexdigest().upper()
         return self._md5
@@ -782,8 +1468,117 @@ class ABF:
 
     def getAllYs(self, channelIndex: int = 0) -> np.ndarray:
         """Return data from all sweeps for the specified channel."""
-        return self.data[channelIndex]
+        return self.data[self._dataRow(channelIndex)]
+
+    def getSweeps(self, sweeps: List[int] = None, channel: int = 0) -> np.ndarray:
+        """
+        Return a 2D (sweeps, points) array of sweep values for a channel so
+        operations can be performed on all sweeps at once (e.g., a mean sweep is
+        abf.getSweeps().mean(axis=0)). Without a sweep list this is a reshaped
+        view of abf.data so no values are copied. Only ABFs with sweeps of equal
+        length are supported.
+
+        ### Parameters
+        1. sweeps -- list of sweep numbers to return (default is all sweeps).
+            Selecting sweeps copies their values into a new array.
+        2. channel -- ABF channel (starting at 0)
+        """
+        if not self._fixedLengthSweeps:
+            raise ValueError("getSweeps() requires sweeps of equal length")
+        self._checkSweepAndChannel(0, channel)
+        pointCount = self.sweepCount * self.sweepPointCount
+        values = self.data[self._dataRow(channel), :pointCount]
+        values = values.reshape(self.sweepCount, self.sweepPointCount)
+        if sweeps is None:
+            return values
+        for sweepNumber in sweeps:
+            self._checkSweepAndChannel(sweepNumber, channel)
+        return values[list(sweeps)]
+
+    def read(self, t0: float, t1: float, channels: List[int] = None) -> np.ndarray:
+        """
+        Return values between two times as a (channels, points) array.
+        Times are in seconds from the start of the data (the time scale of getAllXs).
+        If data has not been loaded only the bytes of this window are read from disk,
+        so long gap-free recordings can be scanned in windows using bounded memory.
+
+        ### Parameters
+        1. t0 -- time (seconds) of the first point to return
+        2. t1 -- time (seconds) after the last point to return
+        3. channels -- list of channels to read (default is every channel in abf.dataChannels)
+        """
+        if channels is None:
+            channels = self.dataChannels
+        rows = [self._dataRow(channel) for channel in channels]
+        pointCount = int(self.dataPointCount/self.channelCount)
+        pointStart = min(max(int(round(t0*self.dataRate)), 0), pointCount)
+        pointEnd = min(max(int(round(t1*self.dataRate)), pointStart), pointCount)
+        if self._data is None:
+            return self._decodePoints(pointStart, pointEnd - pointStart, list(channels))
+        return self.data[rows, pointStart:pointEnd]
+
+    def locate(self, timesSec: Union[float, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the sweep number and the index (within that sweep) of the point
+        nearest each of the given times. Times are in seconds from the start of
+        the file (like sweepX when absoluteTime=True) and may be a single value
+        or an array of any number of values, which are converted all at once.
+        Times between sweeps (or after the last one) return indexes beyond the
+        end of the sweep which started before them.
+
+        ### Parameters
+        1. timesSec -- time or array of times (seconds from the start of the file)
+        """
+        times = np.asarray(timesSec, dtype=np.float64)
+        if self._fixedLengthSweeps:
+            sweepNumbers = np.floor(times / self.sweepIntervalSec).astype(np.int64)
+        else:
+            sweepNumbers = np.searchsorted(self._sweepStartsSec, times, side="right") - 1
+        sweepNumbers = np.clip(sweepNumbers, 0, self.sweepCount - 1)
+        indexes = (times - self._sweepStartsSec[sweepNumbers]) * self.dataRate
+        indexes = np.rint(indexes).astype(np.int64)
+        return sweepNumbers[()], indexes[()]
+
+    def segment(self, lengthSec: float, stepSec: float = None, channel: int = 0) -> np.ndarray:
+        """
+        Return a read-only 2D (segments, points) view of a channel which presents a
+        continuous (gap-free) recording as a series of equal-length segments.
+        Segments are strided views of abf.data so no values are copied
+        (except for memory-mapped data, where the channel is scaled first).
+
+        ### Parameters
+        1. lengthSec -- length of each segment (seconds)
+        2. stepSec -- time between the start of each segment (default is lengthSec).
+            Use a value smaller than lengthSec to create overlapping segments.
+        3. channel -- ABF channel (starting at 0)
+        """
+        if stepSec is None:
+            stepSec = lengthSec
+        segmentPointCount = int(round(lengthSec*self.dataRate))
+        stepPointCount = int(round(stepSec*self.dataRate))
+        if segmentPointCount < 1 or stepPointCount < 1:
+            raise ValueError("segment length and step must be at least one point")
+
+        values = self.data[self._dataRow(channel)]
+        segmentCount = 0
+        if len(values) >= segmentPointCount:
+            segmentCount = (len(values) - segmentPointCount) // stepPointCount + 1
+        return np.lib.stride_tricks.as_strided(
+            values,
+            shape=(segmentCount, segmentPointCount),
+            strides=(values.strides[0]*stepPointCount, values.strides[0]),
+            writeable=False)
 
     def getAllXs(self, channelIndex: int = 0) -> np.ndarray:
         """Return times from all sweeps for the specified channel."""
-        return np.arange(len(self.data[channelIndex]))/self.sampleRate
+        return np.arange(self.data.shape[1])/self.sampleRate
+
+    def getTimeAxis(self, channelIndex: int = 0) -> pyabf.timeAxis.TimeAxis:
+        """
+        Return times from all sweeps for the specified channel as a TimeAxis,
+        which behaves like the array returned by getAllXs() but does not use
+        memory for its values and converts between times and indexes instantly.
+        """
+        self._dataRow(channelIndex)
+        pointCount = int(self.dataPointCount/self.channelCount)
+        return pyabf.timeAxis.TimeAxis(pointCount, self.dataSecPerPoint)
@@ -218,11 +218,17 @@ class HeaderV1(AbfReader):
         self.sFileGUID = "".join(guid)
 
         # format creation date
-        if (self.lFileStartDate == 0):
+        fileName = getattr(fb, "name", None)
+        if (self.lFileStartDate == 0 and not (isinstance(fileName, str) and os.path.isfile(fileName))):
+            # a very old ABF which was not read from a file (bytes or a stream)
+            # has no creation date to use
+            self.abfDateTime = datetime.datetime(1, 1, 1)
+            self.abfDateTimeString = "ERROR"
+        elif (self.lFileStartDate == 0):
             # if the value stored in the header is zero, it means this is a
             # very old ABF file which does not store creation date.
             # For files like this use the file creation date.
-            self.abfDateTime = round(os.path.getctime(fb.name))
+            self.abfDateTime = round(os.path.getctime(fileName))
             timeStamp = datetime.datetime.fromtimestamp(self.abfDateTime)
             self.abfDateTime = timeStamp
             self.abfDateTimeString = timeStamp.strftime('%Y-%m-%dT%H:%M:%S.%f')
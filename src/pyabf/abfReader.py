@@ -5,6 +5,12 @@ class AbfReader:
     def __init__(self, fb):
         self._fb = fb
 
+    def __getstate__(self):
+        # the file is only needed while reading so it is not pickled
+        state = self.__dict__.copy()
+        state.pop("_fb", None)
+        return state
+
     def seek(self, position):
         self._fb.seek(position)
 
@@ -0,0 +1,99 @@
+"""
+Code here reads ABF files stored inside zip and tar archives without
+extracting them to disk.
+
+Members which are stored without compression (zip members using ZIP_STORED
+and members of uncompressed tar files) are memory-mapped in place, so only
+the parts of the ABF which are read are loaded from disk. Compressed members
+are decompressed into memory.
+"""
+
+import mmap
+import os
+import struct
+import tarfile
+import zipfile
+
+# paths like "day.zip::cell3_0001.abf" refer to a member of an archive
+ARCHIVE_SEPARATOR = "::"
+
+# size and layout of the local file header which precedes zip member data
+ZIP_LOCAL_HEADER_FORMAT = "<4s5H3L2H"
+ZIP_LOCAL_HEADER_SIZE = struct.calcsize(ZIP_LOCAL_HEADER_FORMAT)
+
+
+def splitArchivePath(path):
+    """
+    Return the archive path and member name of a path like "day.zip::cell.abf"
+    or None if the path does not refer to an archive member.
+    """
+    if not isinstance(path, str) or not ARCHIVE_SEPARATOR in path:
+        return None
+    if os.path.exists(path):
+        return None
+    archivePath, memberName = path.split(ARCHIVE_SEPARATOR, 1)
+    return archivePath, memberName
+
+
+def readMember(archivePath, memberName):
+    """
+    Return the contents of an archive member as a buffer. Uncompressed members
+    are a memoryview of the memory-mapped archive (nothing is read until used).
+    """
+    archivePath = str(archivePath)
+    if not os.path.isfile(archivePath):
+        raise ValueError("archive does not exist: %s" % archivePath)
+    if zipfile.is_zipfile(archivePath):
+        return _readZipMember(archivePath, memberName)
+    if tarfile.is_tarfile(archivePath):
+        return _readTarMember(archivePath, memberName)
+    raise ValueError("not a zip or tar archive: %s" % archivePath)
+
+
+def _mapFileRegion(filePath, byteStart, byteCount):
+    """Return a memoryview of part of a file using a read-only memory map."""
+    if byteCount == 0:
+        return memoryview(b"")
+    with open(filePath, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped)[byteStart:byteStart+byteCount]
+
+
+def _readZipMember(archivePath, memberName):
+    with zipfile.ZipFile(archivePath) as archive:
+        try:
+            info = archive.getinfo(memberName)
+        except KeyError:
+            raise ValueError("%s not found in %s" % (memberName, archivePath))
+        isEncrypted = info.flag_bits & 0x1
+        if info.compress_type != zipfile.ZIP_STORED or isEncrypted:
+            return archive.read(info)
+
+    # the local header may have a different extra field than the central directory
+    with open(archivePath, 'rb') as f:
+        f.seek(info.header_offset)
+        header = struct.unpack(ZIP_LOCAL_HEADER_FORMAT, f.read(ZIP_LOCAL_HEADER_SIZE))
+    fileNameLength, extraLength = header[-2:]
+    byteStart = info.header_offset + ZIP_LOCAL_HEADER_SIZE
+    byteStart += fileNameLength + extraLength
+    return _mapFileRegion(archivePath, byteStart, info.file_size)
+
+
+def _readTarMember(archivePath, memberName):
+    isCompressed = False
+    try:
+        # only members of uncompressed tar files can be read in place
+        archive = tarfile.open(archivePath, mode="r:")
+    except tarfile.ReadError:
+        archive = tarfile.open(archivePath, mode="r:*")
+        isCompressed = True
+    with archive:
+        try:
+            info = archive.getmember(memberName)
+        except KeyError:
+            raise ValueError("%s not found in %s" % (memberName, archivePath))
+        if not info.isfile():
+            raise ValueError("%s is not a file in %s" % (memberName, archivePath))
+        if isCompressed or info.sparse:
+            return archive.extractfile(info).read()
+    return _mapFileRegion(archivePath, info.offset_data, info.size)
@@ -0,0 +1,111 @@
+"""
+Code here keeps recently opened ABFs in memory so opening the same file again
+(common in notebooks and dashboards) returns the existing ABF instead of
+parsing its header and decoding its data again.
+
+ABFs are only reused while the file's path, size, and modification time are
+unchanged. Recently used ABFs are kept until the memory they use exceeds a
+budget (or there are more than maxCachedABFs of them, since ABFs whose data
+is not in memory still hold headers and open files), then the least recently
+used are dropped. Dropped ABFs are still
+reused (through weak references) as long as something else refers to them.
+
+Because cached ABFs are shared, changes made to one (e.g., filtering its data)
+are seen by everyone who opens the same file with openCached().
+"""
+
+import collections
+import os
+import threading
+import weakref
+import numpy as np
+import pyabf
+
+# the most memory (bytes) used by ABFs the cache keeps alive
+memoryBudgetBytes = 1024**3
+
+# the most ABFs the cache keeps alive (regardless of the memory they use)
+maxCachedABFs = 64
+
+# keys describe a file and the options it was opened with
+# recently used ABFs (least recent first) are held in this dictionary
+cachedABFs = collections.OrderedDict()
+
+# every ABF opened by openCached() which has not been collected
+cachedABFRefs = weakref.WeakValueDictionary()
+
+cacheLock = threading.RLock()
+
+
+def openCached(abfFilePath, **kwargs) -> pyabf.ABF:
+    """
+    Return an ABF for the given file, reusing one opened previously (with
+    the same arguments) if the file has not changed since it was opened.
+    Keyword arguments are passed to the ABF constructor.
+    """
+    abfFilePath = os.path.abspath(str(abfFilePath))
+    fileStats = os.stat(abfFilePath)
+    key = (abfFilePath, fileStats.st_size, fileStats.st_mtime_ns,
+           _hashableOptions(kwargs))
+
+    with cacheLock:
+        abf = cachedABFRefs.get(key)
+        if abf is not None and abf._closed:
+            # ABFs closed by their users (e.g., with statements) cannot be reused
+            cachedABFs.pop(key, None)
+            del cachedABFRefs[key]
+            abf = None
+        if abf is None:
+            abf = pyabf.ABF(abfFilePath, **kwargs)
+            cachedABFRefs[key] = abf
+        cachedABFs[key] = abf
+        cachedABFs.move_to_end(key)
+        _evict()
+        return abf
+
+
+def clearCache() -> None:
+    """Forget all cached ABFs (ABFs still in use elsewhere are not affected)."""
+    with cacheLock:
+        cachedABFs.clear()
+        cachedABFRefs.clear()
+
+
+def cacheMemorySize() -> int:
+    """Return the number of bytes used by ABFs the cache keeps alive."""
+    with cacheLock:
+        return sum(_memorySize(abf) for abf in cachedABFs.values())
+
+
+def _evict():
+    """Drop least recently used ABFs until the cache fits in its memory budget and size limit."""
+    sizes = {key: _memorySize(abf) for key, abf in cachedABFs.items()}
+    totalSize = sum(sizes.values())
+
+    def isFull():
+        return totalSize > memoryBudgetBytes or len(cachedABFs) > maxCachedABFs
+
+    while isFull() and len(cachedABFs) > 1:
+        key, abf = cachedABFs.popitem(last=False)
+        totalSize -= sizes[key]
+    if isFull():
+        cachedABFs.clear()
+
+
+def _memorySize(abf):
+    """Return the number of bytes used by the arrays an ABF holds in memory."""
+    values = abf._data
+    if isinstance(values, np.ndarray) and not isinstance(values, np.memmap):
+        return values.nbytes
+    return 0
+
+
+def _hashableOptions(options):
+    """Return ABF constructor options in a form which can be used as a dictionary key."""
+    def hashable(value):
+        if isinstance(value, (list, tuple)):
+            return tuple(hashable(x) for x in value)
+        if isinstance(value, type) or isinstance(value, np.dtype):
+            return str(np.dtype(value))
+        return value
+    return tuple(sorted((name, hashable(value)) for name, value in options.items()))
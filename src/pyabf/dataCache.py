@@ -0,0 +1,119 @@
+"""
+Code here stores decoded ABF data on disk so files which are analyzed again
+and again only have to be decoded once.
+
+Decoded (de-interleaved and scaled) data is saved as a .npy file in a cache
+folder. Its filename describes the ABF (GUID, size, and modification time)
+and how it was decoded (dtype and channels), so changed files are decoded
+again. Cached data is memory-mapped copy-on-write: values are read from disk
+as they are used, and changes to abf.data never alter the cache file.
+
+Files are written to a temporary file then renamed, so processes sharing a
+cache folder never read partially written data. When the folder grows
+beyond maxCacheBytes the least recently used files are deleted (along with
+temporary files left by processes which died while writing them).
+"""
+
+import os
+import tempfile
+import time
+import numpy as np
+
+# the most disk space (bytes) cache files may use in a cache folder
+maxCacheBytes = 10 * 1024**3
+
+CACHE_FILE_EXTENSION = ".npy"
+TEMP_FILE_EXTENSION = ".tmp"
+
+# temporary files older than this (seconds) were left by processes which died while writing
+STALE_TEMP_FILE_SEC = 10 * 60
+
+
+def cacheFilePath(cacheFolder, abf):
+    """Return the path of the cache file for the data of an ABF."""
+    fileStats = os.stat(abf.abfFilePath)
+    channels = "-".join([str(x) for x in abf.dataChannels])
+    fileName = "%s_%d_%d_%s_ch%s%s" % (
+        abf.fileGUID, fileStats.st_size, fileStats.st_mtime_ns,
+        abf._dataDtype.name, channels, CACHE_FILE_EXTENSION)
+    return os.path.join(cacheFolder, fileName)
+
+
+def load(filePath, shape, dtype):
+    """
+    Return cached data memory-mapped (copy-on-write) from disk, or None if
+    the cache file does not exist or does not hold data of the given shape and dtype.
+    """
+    try:
+        data = np.load(filePath, mmap_mode='c')
+    except (OSError, ValueError):
+        return None
+    if data.shape != tuple(shape) or data.dtype != dtype:
+        return None
+
+    # mark the file as recently used so it is evicted last
+    try:
+        os.utime(filePath)
+    except OSError:
+        pass
+    return data
+
+
+def save(filePath, data):
+    """
+    Save data to the cache (atomically, so other processes never see a partial
+    file) then delete old cache files if the cache folder is too large.
+    """
+    cacheFolder = os.path.dirname(filePath)
+    os.makedirs(cacheFolder, exist_ok=True)
+    fileHandle, tempFilePath = tempfile.mkstemp(suffix=TEMP_FILE_EXTENSION, dir=cacheFolder)
+    try:
+        with os.fdopen(fileHandle, 'wb') as f:
+            np.save(f, data)
+        os.replace(tempFilePath, filePath)
+    except BaseException:
+        if os.path.exists(tempFilePath):
+            os.remove(tempFilePath)
+        raise
+    evict(cacheFolder)
+
+
+def evict(cacheFolder, maxBytes=None):
+    """
+    Delete stale temporary files then the least recently used cache files until
+    the folder holds at most maxBytes. Temporary files still being written count
+    toward maxBytes but are not deleted.
+    """
+    if maxBytes is None:
+        maxBytes = maxCacheBytes
+    cacheFiles = []
+    totalBytes = 0
+    staleTime = time.time() - STALE_TEMP_FILE_SEC
+    for entry in os.scandir(cacheFolder):
+        isCacheFile = entry.name.endswith(CACHE_FILE_EXTENSION)
+        isTempFile = entry.name.endswith(TEMP_FILE_EXTENSION)
+        if not (isCacheFile or isTempFile) or not entry.is_file():
+            continue
+        try:
+            fileStats = entry.stat()
+        except OSError:
+            continue
+        if isTempFile and fileStats.st_mtime < staleTime:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+            continue
+        totalBytes += fileStats.st_size
+        if isCacheFile:
+            cacheFiles.append((fileStats.st_mtime_ns, fileStats.st_size, entry.path))
+
+    for mtime, size, filePath in sorted(cacheFiles):
+        if totalBytes <= maxBytes:
+            break
+        try:
+            os.remove(filePath)
+        except OSError:
+            # another process removed it (or has it open on Windows)
+            pass
+        totalBytes -= size
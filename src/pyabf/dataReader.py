@@ -0,0 +1,248 @@
+"""
+Code here relates to reading and scaling values from the data section of ABF
+files. The data section holds interleaved samples (one per channel) which are
+either 16-bit integers (that must be scaled to become real units) or 32-bit
+floats (that are already in real units).
+"""
+
+import concurrent.futures
+import io
+import os
+import threading
+import numpy as np
+
+
+def scaleData(raw, gain, offset, dtype=np.float32, out=None):
+    """
+    Convert raw ADC values to floating-point values in the units of the channel.
+    Math is performed in the output dtype so float32 values match those of a
+    full decode.
+    """
+    if out is None and np.ndim(raw):
+        out = np.empty(np.shape(raw), dtype=dtype)
+    values = np.multiply(raw, gain, out=out, dtype=dtype)
+    return np.add(values, offset, out=out, dtype=dtype)
+
+
+def _isScaled(dtype, outDtype):
+    """Return True if values of the given dtype must be scaled to become outDtype."""
+    return np.dtype(dtype) == np.int16 and np.dtype(outDtype).kind == 'f'
+
+
+# number of points (per channel) de-interleaved at a time when decoding
+CHUNK_POINT_COUNT = 2**18
+
+
+def decodeData(fb, byteStart, dtype, channelCount, pointCount, channels,
+               gain, offset, outDtype=np.float32, threads=1):
+    """
+    Read pointCount multiplexed points (one value per channel for each point)
+    starting at the given byte position and return the requested channels as
+    a C-contiguous (channels, points) array.
+
+    Data is read in chunks into a reusable buffer, and each chunk is
+    de-interleaved and scaled directly into its place in the output, so a
+    full-size copy of the raw data is never held in memory. Values are only
+    scaled (by the per-channel gain and offset lists) if they are stored as
+    integers and outDtype is a float.
+
+    If threads is greater than 1 chunks are decoded by a pool of threads.
+    Conversion and scaling run in parallel because numpy releases the GIL.
+    Chunks of files on disk are read in parallel too (each thread reads at
+    its own position with os.preadv) but other file objects have a single
+    position so reading them is serialized.
+    """
+    out = np.empty((len(channels), pointCount), dtype=outDtype)
+    chunkPointCount = max(1, min(CHUNK_POINT_COUNT, pointCount))
+    chunkStarts = range(0, pointCount, chunkPointCount)
+    pointByteSize = np.dtype(dtype).itemsize * channelCount
+    scale = _isScaled(dtype, outDtype)
+    readLock = threading.Lock()
+    readAt = _positionalReader(fb)
+
+    def decodeChunks(chunkStarts):
+        buffer = np.empty((chunkPointCount, channelCount), dtype=dtype)
+        for chunkStart in chunkStarts:
+            chunkCount = min(chunkPointCount, pointCount - chunkStart)
+            raw = buffer[:chunkCount]
+            bytePosition = byteStart + chunkStart * pointByteSize
+            if readAt:
+                byteCount = readAt(raw, bytePosition)
+            else:
+                with readLock:
+                    fb.seek(bytePosition)
+                    byteCount = fb.readinto(raw)
+            if byteCount != raw.nbytes:
+                raise ValueError("ABF data section ends before its last point")
+            for row, channel in enumerate(channels):
+                values = out[row, chunkStart:chunkStart+chunkCount]
+                if scale:
+                    scaleData(raw[:, channel], gain[channel], offset[channel],
+                              outDtype, values)
+                else:
+                    values[:] = raw[:, channel]
+
+    if threads > 1 and len(chunkStarts) > 1:
+        with concurrent.futures.ThreadPoolExecutor(threads) as executor:
+            jobs = [chunkStarts[i::threads] for i in range(threads)]
+            for result in executor.map(decodeChunks, jobs):
+                pass
+    else:
+        decodeChunks(chunkStarts)
+
+    return out
+
+
+def _positionalReader(fb):
+    """
+    Return a function which reads from a file on disk into a buffer at a byte
+    position without using (or changing) the position of the file object, so
+    many threads can read at once. Return None if the file object is not a
+    file on disk or positional reads are not supported by this OS.
+    """
+    if not hasattr(os, "preadv") or not isinstance(fb, (io.BufferedReader, io.FileIO)):
+        return None
+    try:
+        fileDescriptor = fb.fileno()
+    except (OSError, ValueError):
+        return None
+
+    def readAt(destination, bytePosition):
+        destination = memoryview(destination).cast('B')
+        byteCount = 0
+        while byteCount < len(destination):
+            bytesRead = os.preadv(fileDescriptor, [destination[byteCount:]],
+                                  bytePosition + byteCount)
+            if bytesRead == 0:
+                break
+            byteCount += bytesRead
+        return byteCount
+
+    return readAt
+
+
+def decodeFile(filePath, byteStart, dtype, channelCount, pointCount, channels,
+               gain, offset, outDtype=np.float32, threads=1):
+    """Open a file and decode points from it (see decodeData)."""
+    with open(filePath, 'rb') as fb:
+        return decodeData(fb, byteStart, dtype, channelCount, pointCount,
+                          channels, gain, offset, outDtype, threads)
+
+
+def applyToFile(func, squeeze, *decodeArgs):
+    """
+    Decode points from a file (using the arguments of decodeFile) and return the
+    result of func called with them. If squeeze is True func is given the values
+    of the first channel as a 1D array. This is run by worker processes, which
+    receive the path and position of the data instead of the values themselves.
+    """
+    values = decodeFile(*decodeArgs)
+    return func(values[0] if squeeze else values)
+
+
+class BufferFile(io.RawIOBase):
+    """
+    A read-only binary file which reads from a buffer (bytes, bytearray, or
+    memoryview) in place. Unlike io.BytesIO the buffer is never copied, and
+    each BufferFile has its own position so many can read one buffer at once.
+    """
+
+    def __init__(self, buffer):
+        self._buffer = memoryview(buffer).cast('B')
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._position = offset
+        elif whence == io.SEEK_CUR:
+            self._position += offset
+        elif whence == io.SEEK_END:
+            self._position = len(self._buffer) + offset
+        else:
+            raise ValueError("invalid whence (%r)" % whence)
+        self._position = max(0, self._position)
+        return self._position
+
+    def readinto(self, destination):
+        destination = memoryview(destination).cast('B')
+        end = min(self._position + len(destination), len(self._buffer))
+        byteCount = max(0, end - self._position)
+        destination[:byteCount] = self._buffer[self._position:end]
+        self._position += byteCount
+        return byteCount
+
+
+class MappedData:
+    """
+    A read-only stand-in for abf.data which wraps a memory-mapped data section.
+    Indexing it like abf.data (channel, then points) only scales the samples
+    which are requested, so memory use is proportional to the data accessed
+    rather than the size of the file.
+    """
+
+    ndim = 2
+
+    def __init__(self, raw, channels, gain, offset, dtype=np.float32):
+        """
+        Raw must be a (points, channels) view of the data section. Rows of this
+        object are the given channels (columns of raw). Integer values are
+        scaled using the per-channel gain and offset lists if dtype is a float.
+        If dtype matches the raw data, read-only views are returned.
+        """
+        self._raw = raw
+        self._channels = list(channels)
+        self._gain = gain
+        self._offset = offset
+        self.dtype = np.dtype(dtype)
+
+    def __len__(self):
+        return len(self._channels)
+
+    def __repr__(self):
+        return "MappedData(%d channels, %d points)" % self.shape
+
+    @property
+    def shape(self):
+        return (len(self._channels), self._raw.shape[0])
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) > 2:
+            raise IndexError("too many indices for data")
+        rowKey = key[0]
+        pointKey = key[1] if len(key) == 2 else slice(None)
+
+        rows = np.arange(len(self))[rowKey]
+        if np.ndim(rows) == 0:
+            return self._scale(pointKey, self._channels[rows])
+        values = [self._scale(pointKey, self._channels[row]) for row in rows]
+        return np.array(values, dtype=self.dtype)
+
+    def __setitem__(self, key, value):
+        raise TypeError("memory-mapped data is read-only. "
+                        "Load the ABF with dataMode='memory' to modify abf.data")
+
+    def __array__(self, dtype=None, copy=None):
+        values = self[:]
+        if dtype is not None:
+            values = values.astype(dtype)
+        return values
+
+    def _scale(self, pointKey, channel):
+        raw = self._raw[pointKey, channel]
+        if self.dtype == self._raw.dtype:
+            return raw
+        if not _isScaled(self._raw.dtype, self.dtype):
+            return np.array(raw, dtype=self.dtype)
+        return scaleData(raw, self._gain[channel], self._offset[channel],
+                         self.dtype)
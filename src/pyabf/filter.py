@@ -40,7 +40,7 @@ def remove(abf):
     Revert to the original data in the ABF. This is accomplished by opening
     the original file and re-reading the data (into abf.data).
     """
-    with open(abf.abfFilePath, 'rb') as fb:
+    with abf._openSource() as fb:
         abf._loadAndScaleData(fb)
 
 
@@ -57,7 +57,9 @@ def gaussian(abf, sigmaMs=5, channel=0):
     if sigmaMs:
         pointsPerMs = abf.dataRate/1000.0
         kernel = _kernelGaussian(int(pointsPerMs*sigmaMs*7))
-        abf.data[channel] = _convolve(abf.data[channel], kernel)
+        row = abf._dataRow(channel)
+        abf.data[row] = _convolve(abf.data[row], kernel)
+        abf._dataModified = True
     else:
         remove(abf)
 
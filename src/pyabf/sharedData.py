@@ -0,0 +1,113 @@
+"""
+Code here places decoded ABF data in shared memory so several processes can
+analyze one recording without each decoding (and holding) its own copy.
+
+abf.toSharedMemory() moves abf.data into a shared memory block and returns a
+small handle. The handle can be sent to other processes (it pickles to a few
+kilobytes) where handle.attach() creates an ABF whose data is a view of the
+shared block. The ABF which created the block removes it when it is closed.
+"""
+
+import mmap
+import os
+import pickle
+import sys
+from multiprocessing import shared_memory
+import numpy as np
+
+try:
+    import _posixshmem
+except ImportError:
+    _posixshmem = None
+
+
+def createSharedMemory(values):
+    """Return a new shared memory block holding a copy of the given array and a view of it."""
+    sharedMemory = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+    sharedValues = np.ndarray(values.shape, values.dtype, buffer=sharedMemory.buf)
+    sharedValues[:] = values
+    return sharedMemory, sharedValues
+
+
+def attachSharedMemory(name):
+    """
+    Open an existing shared memory block. Attaching processes do not own the
+    block, so it is not removed when they exit.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    if _posixshmem is None:
+        # blocks are only tracked (and removed at exit) on POSIX systems
+        return shared_memory.SharedMemory(name)
+    return _UntrackedSharedMemory(name)
+
+
+class _UntrackedSharedMemory(shared_memory.SharedMemory):
+    """
+    An existing POSIX shared memory block opened without registering it with
+    the resource tracker (like SharedMemory(name, track=False) in Python 3.13).
+    Child processes share their parent's resource tracker, so a registration
+    (or unregistration) made by an attaching process would change the owner's.
+    """
+
+    def __init__(self, name):
+        self._name = "/" + name
+        self._fd = _posixshmem.shm_open(self._name, os.O_RDWR, mode=self._mode)
+        try:
+            self._size = os.fstat(self._fd).st_size
+            self._mmap = mmap.mmap(self._fd, self._size)
+        except OSError:
+            os.close(self._fd)
+            self._fd = -1
+            raise
+        self._buf = memoryview(self._mmap)
+
+
+def releaseSharedMemory(sharedMemory, unlink=False):
+    """Close a shared memory block (and remove it if unlink is True)."""
+    try:
+        sharedMemory.close()
+    except BufferError:
+        # arrays still refer to the block, it is unmapped when they are deleted
+        pass
+    if unlink:
+        try:
+            sharedMemory.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedDataHandle:
+    """
+    A small description of ABF data in shared memory (the name of the block,
+    the shape and dtype of the data, and the pickled ABF header without its data).
+    Send this to other processes and call attach() to get a zero-copy ABF.
+
+    Create these with abf.toSharedMemory() rather than instantiating them directly.
+    """
+
+    def __init__(self, name, shape, dtype, abfState):
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._abfState = abfState
+
+    def __repr__(self):
+        return "SharedDataHandle(%r, shape=%s, dtype=%s)" % (
+            self.name, self.shape, self.dtype)
+
+    def attach(self):
+        """
+        Return an ABF whose data is a read-only view of the shared memory block.
+        Closing this ABF releases the view but does not remove the block.
+        """
+        abfClass, abfState = pickle.loads(self._abfState)
+        abf = abfClass.__new__(abfClass)
+        abf.__setstate__(abfState)
+        sharedMemory = attachSharedMemory(self.name)
+        data = np.ndarray(self.shape, self.dtype, buffer=sharedMemory.buf)
+        data.flags.writeable = False
+        abf._sharedMemory = sharedMemory
+        abf._ownsSharedMemory = False
+        abf._data = data
+        return abf
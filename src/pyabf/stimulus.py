@@ -46,12 +46,10 @@ class Stimulus:
         waveform of the DAC for the given channel.
         """
 
-        if hasattr(self.abf, "_synchArraySection"):
-            uniqueSweepLengths = set(self.abf._synchArraySection.lLength)
-            if len(uniqueSweepLengths) > 1:
-                self.text = "variable-length sweeps do not support DAC waveform"
-                return np.full(self.abf._synchArraySection.lLength[stimulusSweep],
-                               self.abf.holdingCommand[self.channel])
+        if not self.abf._fixedLengthSweeps:
+            self.text = "variable-length sweeps do not support DAC waveform"
+            return np.full(self.abf._sweepPointCounts[stimulusSweep],
+                           self.abf.holdingCommand[self.channel])
 
         if self.abf.abfVersion["major"] == 1:
             nWaveformEnable = self.abf._headerV1.nWaveformEnable[self.channel]
@@ -66,7 +64,7 @@ class Stimulus:
                            self.abf.holdingCommand[self.channel])
 
         elif nWaveformSource == 1:
-            epochTable = pyabf.waveform.EpochTable(self.abf, self.channel)
+            epochTable = self.abf._getEpochTable(self.channel)
             self.text = str(epochTable)
             sweepWaveform = epochTable.epochWaveformsBySweep[stimulusSweep]
             sweepC = sweepWaveform.getWaveform()
@@ -103,16 +101,20 @@ def findStimulusWaveformFile(abf, channel=0):
         return str(pathCurrent)
 
     # try path defined by the stimulusFileFolder argument of the ABF constructor
-    pathUserDefined = Path(str(abf.stimulusFileFolder)
-                           ).joinpath(stimBasename).resolve()
-    if pathUserDefined.is_file():
-        return str(pathUserDefined)
-
-    # try the same folder that houses the ABF file
-    pathSameFolderAsABF = Path(
-        abf.abfFilePath).parent.joinpath(stimBasename).resolve()
-    if pathSameFolderAsABF.is_file():
-        return str(pathSameFolderAsABF)
+    pathUserDefined = None
+    if abf.stimulusFileFolder:
+        pathUserDefined = Path(str(abf.stimulusFileFolder)
+                               ).joinpath(stimBasename).resolve()
+        if pathUserDefined.is_file():
+            return str(pathUserDefined)
+
+    # try the same folder that houses the ABF file (if it was read from a file)
+    pathSameFolderAsABF = None
+    if abf.abfFilePath:
+        pathSameFolderAsABF = Path(
+            abf.abfFilePath).parent.joinpath(stimBasename).resolve()
+        if pathSameFolderAsABF.is_file():
+            return str(pathSameFolderAsABF)
 
     # warn if stimulus file was never found
     warnings.warn(
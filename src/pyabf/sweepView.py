@@ -0,0 +1,133 @@
+"""
+Code here provides read-only access to individual sweeps of an ABF.
+
+Calling abf.setSweep() changes many attributes of the ABF (sweepY, sweepX,
+sweepNumber, labels, etc.) so only one sweep can be inspected at a time. A
+SweepView holds everything about one sweep of one channel and never changes
+the ABF it came from, so many views (and many threads) can share one ABF.
+A MultiChannelSweepView does the same for one sweep of every loaded channel.
+"""
+
+import numpy as np
+import pyabf.timeAxis
+
+
+def _readOnly(values):
+    """Return a read-only view of an array."""
+    if isinstance(values, np.ndarray):
+        values = values.view()
+        values.flags.writeable = False
+    return values
+
+
+class _ImmutableView:
+    """Base class for views whose attributes cannot be changed after creation."""
+
+    def _set(self, name, value):
+        object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("%s objects are immutable" % type(self).__name__)
+
+    def __delattr__(self, name):
+        raise AttributeError("%s objects are immutable" % type(self).__name__)
+
+
+class SweepView(_ImmutableView):
+    """
+    An immutable view of one sweep of one channel of an ABF. Values (y) are
+    shared with the ABF's data rather than copied. The command waveform (c),
+    digital outputs (d), and epochs are only generated when accessed.
+
+    Create these with abf.sweep() rather than instantiating them directly.
+    """
+
+    def __init__(self, abf, sweepNumber, channel, absoluteTime=False):
+        unitsY, unitsC, labelY, labelC = abf._getSweepUnitsAndLabels(channel)
+        y = _readOnly(abf._getSweepValues(sweepNumber, channel))
+        timeOffset = 0
+        if absoluteTime:
+            timeOffset = abf._sweepStartsSec[sweepNumber]
+
+        self._set("_abf", abf)
+        self._set("_timeOffset", timeOffset)
+        self._set("sweepNumber", sweepNumber)
+        self._set("channel", channel)
+        self._set("y", y)
+        self._set("unitsY", unitsY)
+        self._set("unitsC", unitsC)
+        self._set("unitsX", "sec")
+        self._set("labelY", labelY)
+        self._set("labelC", labelC)
+        self._set("labelX", "Time (seconds)")
+        self._set("labelD", "Digital Output (V)")
+
+    def __len__(self):
+        return len(self.y)
+
+    def __repr__(self):
+        return "SweepView(%s, sweep %d, channel %d)" % (
+            self._abf.abfID, self.sweepNumber, self.channel)
+
+    @property
+    def x(self) -> pyabf.timeAxis.TimeAxis:
+        """Time of each point (seconds)"""
+        return pyabf.timeAxis.TimeAxis(len(self.y), self._abf.dataSecPerPoint,
+                                       self._timeOffset)
+
+    @property
+    def c(self) -> np.ndarray:
+        """Command waveform (DAC) of this sweep"""
+        return self._abf._getSweepCommand(self.sweepNumber, self.channel, len(self.y))
+
+    @property
+    def epochs(self):
+        """Epoch waveform (EpochSweepWaveform) of this sweep (None if the channel has no DAC)"""
+        return self._abf._getSweepEpochs(self.sweepNumber, self.channel)
+
+    def d(self, digOutNumber=0) -> np.ndarray:
+        """Generate a waveform for the given digital output."""
+        epochs = self.epochs
+        if epochs is None:
+            return None
+        return epochs.getDigitalWaveform(digOutNumber)
+
+
+class MultiChannelSweepView(_ImmutableView):
+    """
+    An immutable view of one sweep of several channels of an ABF. Values (y)
+    are a (channels, points) array and units and labels are lists with one
+    item per channel (in the order of channels).
+
+    Create these with abf.sweepAllChannels() rather than instantiating them directly.
+    """
+
+    def __init__(self, abf, sweepNumber, channels, absoluteTime=False):
+        unitsAndLabels = [abf._getSweepUnitsAndLabels(x) for x in channels]
+        unitsY, unitsC, labelY, labelC = [list(x) for x in zip(*unitsAndLabels)]
+        y = _readOnly(abf._getSweepValuesOfChannels(sweepNumber, channels))
+        timeOffset = 0
+        if absoluteTime:
+            timeOffset = abf._sweepStartsSec[sweepNumber]
+
+        self._set("_abf", abf)
+        self._set("_timeOffset", timeOffset)
+        self._set("sweepNumber", sweepNumber)
+        self._set("channels", list(channels))
+        self._set("y", y)
+        self._set("unitsY", unitsY)
+        self._set("unitsC", unitsC)
+        self._set("unitsX", "sec")
+        self._set("labelY", labelY)
+        self._set("labelC", labelC)
+        self._set("labelX", "Time (seconds)")
+
+    def __repr__(self):
+        return "MultiChannelSweepView(%s, sweep %d, channels %s)" % (
+            self._abf.abfID, self.sweepNumber, self.channels)
+
+    @property
+    def x(self) -> pyabf.timeAxis.TimeAxis:
+        """Time of each point (seconds)"""
+        return pyabf.timeAxis.TimeAxis(self.y.shape[1], self._abf.dataSecPerPoint,
+                                       self._timeOffset)
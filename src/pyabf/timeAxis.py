@@ -0,0 +1,141 @@
+"""
+Code here represents the time of every point in a sweep (or recording).
+
+Times of evenly sampled data are just (index * step + start), so rather than
+allocating 8 bytes per point a TimeAxis stores these few numbers and behaves
+like a read-only 1D array. Values are only generated when they are used as an
+array (math, plotting, np.asarray(), etc.) and times and indexes can be
+converted to each other without generating any values.
+"""
+
+import numbers
+import numpy as np
+
+
+class TimeAxis(np.lib.mixins.NDArrayOperatorsMixin):
+    """
+    Times (seconds) of evenly spaced points. This behaves like a read-only 1D
+    float64 array (it can be indexed, sliced, iterated, plotted, and used in
+    math) but values are generated on demand. Slicing and adding or subtracting
+    a number return a new TimeAxis, so these are free for any length.
+    """
+
+    ndim = 1
+    dtype = np.dtype(np.float64)
+
+    def __init__(self, length: int, step: float, offset: float = 0,
+                 firstIndex: int = 0, indexStep: int = 1):
+        """
+        Point i of this axis is at time ((firstIndex + i*indexStep) * step + offset).
+        Most axes are just TimeAxis(pointCount, secPerPoint).
+        """
+        if length < 0:
+            raise ValueError("length cannot be negative")
+        self._length = int(length)
+        self._step = step
+        self._offset = offset
+        self._firstIndex = int(firstIndex)
+        self._indexStep = int(indexStep)
+
+    def __repr__(self):
+        return "TimeAxis(start=%r, step=%r, length=%d)" % (
+            float(self.start), float(self.step), len(self))
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def shape(self):
+        return (self._length,)
+
+    @property
+    def size(self):
+        return self._length
+
+    @property
+    def start(self) -> float:
+        """Time of the first point (seconds)"""
+        return self.indexToTime(0)
+
+    @property
+    def step(self) -> float:
+        """Time between points (seconds)"""
+        return self._step * self._indexStep
+
+    def indexToTime(self, index):
+        """Return the time (seconds) of an index (or array of indexes)."""
+        index = np.asarray(index)
+        times = (self._firstIndex + index*self._indexStep) * self._step + self._offset
+        return times[()]
+
+    def timeToIndex(self, timeSec):
+        """
+        Return the index of the point nearest a time (or array of times).
+        Indexes are not limited to the length of the axis.
+        """
+        index = np.rint((np.asarray(timeSec) - self.start) / self.step)
+        index = index.astype(np.int64)
+        return int(index) if index.ndim == 0 else index
+
+    def __array__(self, dtype=None, copy=None):
+        values = np.arange(self._length) * self._indexStep + self._firstIndex
+        values = values * self._step + self._offset
+        if dtype is not None:
+            values = values.astype(dtype)
+        return values
+
+    def __iter__(self):
+        return iter(np.asarray(self))
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            index = range(self._length)[key]
+            return np.float64(self.indexToTime(index))
+        if isinstance(key, slice):
+            indexes = range(self._length)[key]
+            return TimeAxis(len(indexes), self._step, self._offset,
+                            self._firstIndex + indexes.start*self._indexStep,
+                            self._indexStep * indexes.step)
+        return np.asarray(self)[key]
+
+    def __setitem__(self, key, value):
+        raise TypeError("TimeAxis values are read-only")
+
+    def __getattr__(self, name):
+        # ndarray methods (min, max, copy, tolist, etc.) act on generated values
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(np.asarray(self), name)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if any(isinstance(x, TimeAxis) for x in kwargs.get("out", ())):
+            return NotImplemented
+        if method == "__call__" and not kwargs and len(inputs) == 2:
+            a, b = inputs
+            if a is self and isinstance(b, numbers.Real):
+                if ufunc is np.add:
+                    return self._shifted(b)
+                if ufunc is np.subtract:
+                    return self._shifted(-b)
+            if b is self and isinstance(a, numbers.Real) and ufunc is np.add:
+                return self._shifted(a)
+        inputs = [np.asarray(x) if isinstance(x, TimeAxis) else x for x in inputs]
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def _shifted(self, seconds):
+        """Return a copy of this axis with all times shifted by the given amount."""
+        return TimeAxis(self._length, self._step, self._offset + seconds,
+                        self._firstIndex, self._indexStep)
+
+    # in-place math returns a new axis (like integers) because values are read-only
+    def __iadd__(self, other):
+        return self + other
+
+    def __isub__(self, other):
+        return self - other
+
+    def __imul__(self, other):
+        return self * other
+
+    def __itruediv__(self, other):
+        return self / other
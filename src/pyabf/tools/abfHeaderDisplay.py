@@ -13,6 +13,8 @@ import numpy as np
 np.set_printoptions(precision=4, suppress=True, threshold=5)
 
 import pyabf.waveform
+import pyabf.timeAxis
+import pyabf.dataReader
 
 
 def standardNumpyText(data):
@@ -221,6 +223,12 @@ def abfInfoPage(abf):
             page.addThing(thingName, thing)
         elif thing is None or thing is False or thing is True:
             page.addThing(thingName, thing)
+        elif isinstance(thing, pyabf.timeAxis.TimeAxis):
+            # described by its start, step, and length (values are not generated)
+            page.addThing(thingName, repr(thing))
+        elif isinstance(thing, pyabf.dataReader.MappedData):
+            # memory-mapped data is described by its shape (values are not read)
+            page.addThing(thingName, "%r of %s" % (thing, thing.dtype))
         else:
             print("Unsure how to generate info for:", thingName, type(thing))
 
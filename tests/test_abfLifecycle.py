@@ -0,0 +1,196 @@
+"""
+Tests related to the lifetime of ABF objects: the file handle they keep open
+for reading and releasing it with close() or a with statement.
+"""
+
+import sys
+import gc
+import os
+import io
+import pickle
+import concurrent.futures
+import struct
+import threading
+import time
+import pytest
+import numpy as np
+
+try:
+    # this ensures pyABF is imported from this specific path
+    sys.path.insert(0, "src")
+    import pyabf
+    import pyabf.filter
+    import pyabf.abfWriter
+except:
+    raise ImportError("couldn't import local pyABF")
+
+
+ABF_PATH = "data/abfs/14o16001_vc_pair_step.abf"
+
+
+def test_lazyReads_reuseOneHandle(monkeypatch):
+    abf = pyabf.ABF(ABF_PATH, loadData=False)
+    assert abf._fileHandle is None
+    abf.setSweep(0)
+    handle = abf._fileHandle
+    assert handle is not None and not handle.closed
+
+    def openFails(*args, **kwargs):
+        raise AssertionError("the ABF file was opened again")
+    monkeypatch.setattr("builtins.open", openFails)
+    for sweep in abf.sweepList:
+        abf.setSweep(sweep)
+    abf.md5
+    abf.read(0, 1)
+    assert abf._fileHandle is handle
+    abf.close()
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="requires /proc")
+@pytest.mark.parametrize("dataMode", ["memory", "mmap"])
+def test_headerOnly_holdsNoDescriptor(dataMode):
+    gc.collect()
+    descriptorCount = len(os.listdir("/proc/self/fd"))
+    abfs = [pyabf.ABF(ABF_PATH, loadData=False, dataMode=dataMode)
+            for i in range(20)]
+    assert all(abf._fileHandle is None for abf in abfs)
+    assert len(os.listdir("/proc/self/fd")) <= descriptorCount
+
+
+def test_loadedData_doesNotHoldFileOpen():
+    abf = pyabf.ABF(ABF_PATH)
+    assert abf._fileHandle is None
+    pyabf.filter.remove(abf)
+    assert abf._fileHandle is not None
+    abf.close()
+    assert abf._fileHandle is None
+
+
+@pytest.mark.parametrize("loadData", [True, False])
+def test_withStatement_closesABF(loadData):
+    abfLoaded = pyabf.ABF(ABF_PATH)
+    with pyabf.ABF(ABF_PATH, loadData=loadData) as abf:
+        abf.setSweep(2)
+        sweepY = abf.sweepY
+        handle = abf._fileHandle
+    assert np.array_equal(sweepY, abfLoaded.getAllYs()[
+        2*abf.sweepPointCount:3*abf.sweepPointCount])
+    assert handle is None or handle.closed
+    if loadData:
+        abf.setSweep(3)
+    else:
+        with pytest.raises(ValueError):
+            abf.setSweep(3)
+    with pytest.raises(ValueError):
+        abf.md5
+    abf.close()
+
+
+def test_close_mmapAndFileObjects():
+    abf = pyabf.ABF(ABF_PATH, dataMode="mmap")
+    abf.close()
+    with pytest.raises(ValueError):
+        abf.data
+
+    with open(ABF_PATH, 'rb') as f:
+        fileObject = io.BytesIO(f.read())
+    with pyabf.ABF(fileObject, loadData=False):
+        pass
+    assert not fileObject.closed
+
+
+def appendSamples(abfPath, values, chunkSize, delaySec):
+    """Append int16 values to an ABF1 file in chunks (like an acquisition program would)."""
+    with open(abfPath, 'r+b') as f:
+        f.seek(10)
+        valueCount = struct.unpack('i', f.read(4))[0]
+        for i in range(0, len(values), chunkSize):
+            chunk = values[i:i+chunkSize]
+            f.seek(0, 2)
+            f.write(chunk.tobytes())
+            f.flush()
+            valueCount += len(chunk)
+            f.seek(10)
+            f.write(struct.pack('i', valueCount))
+            f.flush()
+            time.sleep(delaySec)
+
+
+def test_follow_yieldsAppendedSamples(tmp_path):
+    abfPath = str(tmp_path / "recording.abf")
+    # the ABF1 header is read up to byte 5806, so start with some recorded values
+    pyabf.abfWriter.writeABF1(np.zeros((1, 2000)), abfPath, 20_000)
+    with open(abfPath, 'r+b') as f:
+        f.truncate(2048 + 2000*2)
+    values = np.random.randint(-1000, 1000, 5000).astype(np.int16)
+    writer = threading.Thread(target=appendSamples,
+                              args=(abfPath, values, 700, 0.02))
+    writer.start()
+    chunks = list(pyabf.ABF.follow(abfPath, pollSec=0.005, timeoutSec=0.5))
+    writer.join()
+
+    assert len(chunks) > 1
+    assert all(chunk.shape[0] == 1 for chunk in chunks)
+    abf = pyabf.ABF(abfPath)
+    assert np.array_equal(np.hstack(chunks), abf.data)
+    assert abf.data.shape[1] == 2000 + len(values)
+
+
+def test_tail_startsAtTime():
+    abf = pyabf.ABF(ABF_PATH, loadData=False)
+    chunks = list(abf.tail(pollSec=0, timeoutSec=0, startSec=1))
+    assert len(chunks) == 1
+    assert np.array_equal(chunks[0], abf.data[:, int(abf.dataRate):])
+    assert list(abf.tail(timeoutSec=0, startSec=abf.dataLengthSec)) == []
+
+
+def sweepMeanInWorker(abf, sweepNumber):
+    abf.setSweep(sweepNumber, 1)
+    return np.mean(abf.sweepY)
+
+
+@pytest.mark.parametrize("dataMode", ["memory", "mmap"])
+def test_pickle_excludesData(dataMode):
+    abf = pyabf.ABF("data/abfs/16d22006_kim_gapfree.abf", dataMode=dataMode)
+    abf.setSweep(0, 1)
+    pickled = pickle.dumps(abf)
+    assert len(pickled) < 100_000 < np.asarray(abf.data).nbytes
+    abfCopy = pickle.loads(pickled)
+    assert abfCopy._data is None
+    assert np.array_equal(abfCopy.sweepY, abf.sweepY)
+    assert abfCopy.sweepChannel == 1
+    assert np.array_equal(np.asarray(abfCopy.data), np.asarray(abf.data))
+    assert abfCopy.headerText == abf.headerText
+
+
+def test_pickle_keepsBaselineSubtractedSweep():
+    abf = pyabf.ABF(ABF_PATH)
+    abf.setSweep(3, baseline=[0, 0.1])
+    abfCopy = pickle.loads(pickle.dumps(abf))
+    assert np.array_equal(abfCopy.sweepY, abf.sweepY)
+
+
+def test_pickle_sources():
+    with open(ABF_PATH, 'rb') as f:
+        abfBytes = f.read()
+    abf = pickle.loads(pickle.dumps(pyabf.ABF(abfBytes, loadData=False)))
+    assert np.array_equal(abf.data, pyabf.ABF(ABF_PATH).data)
+    with pytest.raises(TypeError):
+        pickle.dumps(pyabf.ABF(io.BytesIO(abfBytes)))
+
+
+def test_pickle_closedABFReadsFileAgain():
+    with pyabf.ABF(ABF_PATH, loadData=False) as abf:
+        abf.setSweep(1)
+    abfCopy = pickle.loads(pickle.dumps(abf))
+    assert np.array_equal(abfCopy.data, pyabf.ABF(ABF_PATH).data)
+    abfCopy.setSweep(2)
+    abfCopy.close()
+
+
+def test_pickle_sendToProcessPool():
+    abf = pyabf.ABF(ABF_PATH)
+    with concurrent.futures.ProcessPoolExecutor(2) as pool:
+        means = list(pool.map(sweepMeanInWorker, [abf]*abf.sweepCount,
+                              abf.sweepList))
+    assert means == abf.mapSweeps(np.mean, 1)
@@ -0,0 +1,137 @@
+"""
+Tests related to reading ABFs from sources other than paths (bytes, buffers,
+and file objects). These must produce the same header and values as a path.
+"""
+
+import sys
+import io
+import os
+import tarfile
+import zipfile
+import pytest
+import numpy as np
+import glob
+
+try:
+    # this ensures pyABF is imported from this specific path
+    sys.path.insert(0, "src")
+    import pyabf
+except:
+    raise ImportError("couldn't import local pyABF")
+
+
+allABFs = glob.glob("data/abfs/*.abf")
+
+
+def assertSameABF(abf, abfFromPath):
+    assert abf.abfVersionString == abfFromPath.abfVersionString
+    assert abf.fileGUID == abfFromPath.fileGUID
+    assert abf.sweepCount == abfFromPath.sweepCount
+    assert np.array_equal(abf.data, abfFromPath.data)
+    for sweep in abfFromPath.sweepList:
+        abf.setSweep(sweep)
+        abfFromPath.setSweep(sweep)
+        assert np.array_equal(abf.sweepY, abfFromPath.sweepY)
+
+
+@pytest.mark.parametrize("abfPath", allABFs)
+def test_bytes_matchPath(abfPath):
+    abfFromPath = pyabf.ABF(abfPath)
+    with open(abfPath, 'rb') as f:
+        abfBytes = f.read()
+    abf = pyabf.ABF(abfBytes)
+    assert abf.abfFilePath is None
+    assert abf.md5 == abfFromPath.md5
+    assertSameABF(abf, abfFromPath)
+
+
+@pytest.mark.parametrize("source", ["bytearray", "memoryview", "BytesIO", "file"])
+@pytest.mark.parametrize("loadData", [True, False])
+def test_sources_matchPath(source, loadData):
+    abfPath = "data/abfs/14o16001_vc_pair_step.abf"
+    abfFromPath = pyabf.ABF(abfPath)
+    with open(abfPath, 'rb') as f:
+        abfBytes = f.read()
+    if source == "bytearray":
+        abfSource = bytearray(abfBytes)
+    elif source == "memoryview":
+        abfSource = memoryview(abfBytes)
+    elif source == "BytesIO":
+        abfSource = io.BytesIO(abfBytes)
+    else:
+        abfSource = open(abfPath, 'rb')
+    abf = pyabf.ABF(abfSource, loadData=loadData)
+    assertSameABF(abf, abfFromPath)
+    if source == "file":
+        assert abf.abfFilePath == abfFromPath.abfFilePath
+        abfSource.close()
+
+
+@pytest.mark.parametrize("source", ["bytes", "file"])
+def test_sources_mmap(source):
+    abfPath = "data/abfs/14o16001_vc_pair_step.abf"
+    abfFromPath = pyabf.ABF(abfPath)
+    with open(abfPath, 'rb') as f:
+        if source == "bytes":
+            abf = pyabf.ABF(f.read(), dataMode="mmap")
+        else:
+            abf = pyabf.ABF(f, dataMode="mmap")
+        assertSameABF(abf, abfFromPath)
+
+    with pytest.raises(ValueError):
+        pyabf.ABF(io.BytesIO(b"ABF2"), dataMode="mmap")
+
+
+def test_sources_threadsShareFileObject():
+    abfPath = "data/abfs/14o16001_vc_pair_step.abf"
+    abfFromPath = pyabf.ABF(abfPath)
+    with open(abfPath, 'rb') as f:
+        abf = pyabf.ABF(io.BytesIO(f.read()), loadData=False)
+    means = abf.mapSweeps(np.mean, 0, workers=4)
+    assert means == abfFromPath.mapSweeps(np.mean, 0)
+    with pytest.raises(ValueError):
+        abf.mapSweeps(np.mean, 0, executor="process")
+
+
+@pytest.fixture
+def archives(tmp_path):
+    abfPaths = ["data/abfs/14o16001_vc_pair_step.abf",
+                "data/abfs/05210017_vc_abf1.abf"]
+    paths = {}
+    for name, compression in [("stored.zip", zipfile.ZIP_STORED),
+                              ("deflated.zip", zipfile.ZIP_DEFLATED)]:
+        paths[name] = str(tmp_path / name)
+        with zipfile.ZipFile(paths[name], "w", compression) as archive:
+            for abfPath in abfPaths:
+                archive.write(abfPath, "day/" + os.path.basename(abfPath))
+    for name, mode in [("plain.tar", "w"), ("compressed.tar.gz", "w:gz")]:
+        paths[name] = str(tmp_path / name)
+        with tarfile.open(paths[name], mode) as archive:
+            for abfPath in abfPaths:
+                archive.add(abfPath, "day/" + os.path.basename(abfPath))
+    return abfPaths, paths
+
+
+@pytest.mark.parametrize("archiveName", ["stored.zip", "deflated.zip",
+                                         "plain.tar", "compressed.tar.gz"])
+def test_archive_membersMatchPath(archives, archiveName):
+    abfPaths, archivePaths = archives
+    for abfPath in abfPaths:
+        memberName = "day/" + os.path.basename(abfPath)
+        abfFromPath = pyabf.ABF(abfPath)
+        abf = pyabf.ABF(archivePaths[archiveName] + "::" + memberName)
+        assert abf.abfID == abfFromPath.abfID
+        assertSameABF(abf, abfFromPath)
+        abf = pyabf.ABF.fromArchive(archivePaths[archiveName], memberName,
+                                    loadData=False)
+        assertSameABF(abf, abfFromPath)
+
+
+def test_archive_storedMembersAreMapped(archives):
+    abfPaths, archivePaths = archives
+    for archiveName in ["stored.zip", "plain.tar"]:
+        buffer = pyabf.archive.readMember(
+            archivePaths[archiveName], "day/" + os.path.basename(abfPaths[0]))
+        assert isinstance(buffer, memoryview)
+    with pytest.raises(ValueError):
+        pyabf.ABF.fromArchive(archivePaths["stored.zip"], "missing.abf")
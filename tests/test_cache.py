@@ -0,0 +1,95 @@
+"""
+Tests related to reusing ABFs opened with pyabf.openCached().
+"""
+
+import sys
+import gc
+import glob
+import os
+import shutil
+import pytest
+import numpy as np
+
+try:
+    # this ensures pyABF is imported from this specific path
+    sys.path.insert(0, "src")
+    import pyabf
+    import pyabf.cache
+except:
+    raise ImportError("couldn't import local pyABF")
+
+
+ABF_PATH = "data/abfs/14o16001_vc_pair_step.abf"
+
+
+@pytest.fixture(autouse=True)
+def emptyCache():
+    pyabf.cache.clearCache()
+    yield
+    pyabf.cache.clearCache()
+
+
+def test_openCached_reusesABF():
+    abf = pyabf.openCached(ABF_PATH)
+    assert pyabf.openCached(ABF_PATH) is abf
+    assert np.array_equal(abf.data, pyabf.ABF(ABF_PATH).data)
+    assert pyabf.openCached(ABF_PATH, loadData=False) is not abf
+    assert pyabf.openCached(ABF_PATH, channels=[1]) is not abf
+    assert pyabf.openCached(ABF_PATH, channels=[1]) is \
+        pyabf.openCached(ABF_PATH, channels=[1])
+
+
+@pytest.mark.parametrize("options", [dict(loadData=False), dict(dataMode="mmap")])
+def test_openCached_replacesClosedABFs(options):
+    with pyabf.openCached(ABF_PATH, **options) as abf:
+        abf.setSweep(0)
+    abfReopened = pyabf.openCached(ABF_PATH, **options)
+    assert abfReopened is not abf
+    abfReopened.setSweep(1)
+    assert pyabf.openCached(ABF_PATH, **options) is abfReopened
+
+
+def test_openCached_reloadsModifiedFiles(tmp_path):
+    abfPath = str(tmp_path / "copy.abf")
+    shutil.copy(ABF_PATH, abfPath)
+    abf = pyabf.openCached(abfPath)
+    stats = os.stat(abfPath)
+    os.utime(abfPath, ns=(stats.st_atime_ns, stats.st_mtime_ns + 10**9))
+    assert pyabf.openCached(abfPath) is not abf
+
+
+def test_openCached_evictsLeastRecentlyUsed(monkeypatch):
+    abfSize = pyabf.ABF(ABF_PATH).data.nbytes
+    monkeypatch.setattr(pyabf.cache, "memoryBudgetBytes", abfSize * 2)
+    abfPaths = ["data/abfs/14o16001_vc_pair_step.abf",
+                "data/abfs/17o05024_vc_steps.abf",
+                "data/abfs/17o05026_vc_stim.abf"]
+    abfIDs = [id(pyabf.openCached(abfPath)) for abfPath in abfPaths]
+    assert pyabf.cache.cacheMemorySize() <= pyabf.cache.memoryBudgetBytes
+    assert len(pyabf.cache.cachedABFs) < len(abfPaths)
+
+    # the most recently used ABF is kept alive by the cache
+    assert id(pyabf.openCached(abfPaths[-1])) == abfIDs[-1]
+
+
+@pytest.mark.parametrize("options", [dict(loadData=False), dict(dataMode="mmap")])
+def test_openCached_limitsABFsWithoutDataInMemory(monkeypatch, options):
+    monkeypatch.setattr(pyabf.cache, "memoryBudgetBytes", 1)
+    monkeypatch.setattr(pyabf.cache, "maxCachedABFs", 3)
+    abfPaths = sorted(glob.glob("data/abfs/*.abf"))[:10]
+    for abfPath in abfPaths:
+        pyabf.openCached(abfPath, **options)
+    assert pyabf.cache.cacheMemorySize() == 0
+    assert len(pyabf.cache.cachedABFs) == 3
+    gc.collect()
+    assert len(pyabf.cache.cachedABFRefs) == 3
+
+
+def test_openCached_weakReferencesOutliveEviction(monkeypatch):
+    monkeypatch.setattr(pyabf.cache, "memoryBudgetBytes", 0)
+    abf = pyabf.openCached(ABF_PATH)
+    assert len(pyabf.cache.cachedABFs) == 0
+    assert pyabf.openCached(ABF_PATH) is abf
+    del abf
+    gc.collect()
+    assert len(pyabf.cache.cachedABFRefs) == 0
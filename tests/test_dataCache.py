@@ -0,0 +1,118 @@
+"""
+Tests related to saving decoded data to (and loading it from) a cache folder.
+Cached data must be identical to decoded data and the cache must never change.
+"""
+
+import sys
+import os
+import shutil
+import time
+import pytest
+import numpy as np
+
+try:
+    # this ensures pyABF is imported from this specific path
+    sys.path.insert(0, "src")
+    import pyabf
+    import pyabf.dataCache
+    import pyabf.filter
+except:
+    raise ImportError("couldn't import local pyABF")
+
+
+ABF_PATH = "data/abfs/14o16001_vc_pair_step.abf"
+
+
+def cacheFiles(folder):
+    return sorted([x for x in os.listdir(folder) if x.endswith(".npy")])
+
+
+def test_dataCache_savesThenMaps(tmp_path):
+    abfDecoded = pyabf.ABF(ABF_PATH)
+    abf = pyabf.ABF(ABF_PATH, dataCacheFolder=tmp_path)
+    assert len(cacheFiles(tmp_path)) == 1
+    assert not isinstance(abf.data, np.memmap)
+
+    abfCached = pyabf.ABF(ABF_PATH, dataCacheFolder=tmp_path)
+    assert isinstance(abfCached.data, np.memmap)
+    assert np.array_equal(abfCached.data, abfDecoded.data)
+    for sweep in abfDecoded.sweepList:
+        abfCached.setSweep(sweep, 1)
+        abfDecoded.setSweep(sweep, 1)
+        assert np.array_equal(abfCached.sweepY, abfDecoded.sweepY)
+
+
+def test_dataCache_isNeverModified(tmp_path):
+    pyabf.ABF(ABF_PATH, dataCacheFolder=tmp_path)
+    abf = pyabf.ABF(ABF_PATH, dataCacheFolder=tmp_path)
+    pyabf.filter.gaussian(abf, 2)
+    abf.data[0, :100] = 123
+    abf = pyabf.ABF(ABF_PATH, dataCacheFolder=tmp_path)
+    assert np.array_equal(abf.data, pyabf.ABF(ABF_PATH).data)
+
+
+def test_dataCache_keyedByFileAndOptions(tmp_path):
+    abfPath = str(tmp_path / "copy.abf")
+    cacheFolder = str(tmp_path / "cache")
+    shutil.copy(ABF_PATH, abfPath)
+    pyabf.ABF(abfPath, dataCacheFolder=cacheFolder)
+    pyabf.ABF(abfPath, dataCacheFolder=cacheFolder, channels=[1])
+    pyabf.ABF(abfPath, dataCacheFolder=cacheFolder, dtype=np.float64)
+    assert len(cacheFiles(cacheFolder)) == 3
+    stats = os.stat(abfPath)
+    os.utime(abfPath, ns=(stats.st_atime_ns, stats.st_mtime_ns + 10**9))
+    abf = pyabf.ABF(abfPath, dataCacheFolder=cacheFolder)
+    assert not isinstance(abf.data, np.memmap)
+    assert len(cacheFiles(cacheFolder)) == 4
+
+
+def test_dataCache_evictsLeastRecentlyUsed(tmp_path, monkeypatch):
+    abfPaths = ["data/abfs/14o16001_vc_pair_step.abf",
+                "data/abfs/17o05024_vc_steps.abf",
+                "data/abfs/17o05026_vc_stim.abf"]
+    cacheSizes = [pyabf.ABF(x).data.nbytes + 128 for x in abfPaths]
+    monkeypatch.setattr(pyabf.dataCache, "maxCacheBytes",
+                        cacheSizes[-1] + cacheSizes[-2])
+    for abfPath in abfPaths:
+        pyabf.ABF(abfPath, dataCacheFolder=tmp_path)
+    totalBytes = sum([os.path.getsize(tmp_path / x) for x in cacheFiles(tmp_path)])
+    assert totalBytes <= pyabf.dataCache.maxCacheBytes
+    newestCache = os.path.basename(pyabf.dataCache.cacheFilePath(
+        str(tmp_path), pyabf.ABF(abfPaths[-1], loadData=False)))
+    assert newestCache in cacheFiles(tmp_path)
+    assert len(cacheFiles(tmp_path)) < len(abfPaths)
+    assert not [x for x in os.listdir(tmp_path) if x.endswith(".tmp")]
+
+
+def test_dataCache_saveFailureOnlyWarns(tmp_path):
+    cacheFolder = tmp_path / "notAFolder"
+    cacheFolder.write_text("this file is where the cache folder should be")
+    with pytest.warns(UserWarning, match="could not save"):
+        abf = pyabf.ABF(ABF_PATH, dataCacheFolder=cacheFolder)
+    assert np.array_equal(abf.data, pyabf.ABF(ABF_PATH).data)
+
+
+def test_dataCache_allowsProcessWorkers(tmp_path):
+    pyabf.ABF(ABF_PATH, dataCacheFolder=tmp_path)
+    abf = pyabf.ABF(ABF_PATH, dataCacheFolder=tmp_path)
+    assert isinstance(abf.data, np.memmap)
+    assert abf.mapSweeps(np.mean, 0, workers=2, executor="process") == \
+        abf.mapSweeps(np.mean, 0)
+
+
+def test_dataCache_evictsStaleTempFiles(tmp_path):
+    staleFile = tmp_path / "stale.tmp"
+    recentFile = tmp_path / "recent.tmp"
+    staleFile.write_bytes(b"x" * 1000)
+    recentFile.write_bytes(b"x" * 1000)
+    staleTime = time.time() - pyabf.dataCache.STALE_TEMP_FILE_SEC - 60
+    os.utime(staleFile, (staleTime, staleTime))
+    pyabf.ABF(ABF_PATH, dataCacheFolder=tmp_path)
+    assert not staleFile.exists()
+    assert recentFile.exists()
+
+    # files being written count toward the size of the cache
+    cacheBytes = os.path.getsize(tmp_path / cacheFiles(tmp_path)[0])
+    pyabf.dataCache.evict(tmp_path, maxBytes=cacheBytes)
+    assert cacheFiles(tmp_path) == []
+    assert recentFile.exists()
@@ -0,0 +1,203 @@
+"""
+Tests related to the different ways ABF data can be read from disk.
+Every data mode must produce the same values as a full decode into memory.
+"""
+
+import sys
+import os
+import pytest
+import numpy as np
+import glob
+
+try:
+    # this ensures pyABF is imported from this specific path
+    sys.path.insert(0, "src")
+    import pyabf
+except:
+    raise ImportError("couldn't import local pyABF")
+
+
+allABFs = glob.glob("data/abfs/*.abf")
+
+
+@pytest.mark.parametrize("abfPath", allABFs)
+def test_mmap_matchesMemory(abfPath):
+    abfMemory = pyabf.ABF(abfPath)
+    abfMapped = pyabf.ABF(abfPath, dataMode="mmap")
+    assert abfMapped.data.shape == abfMemory.data.shape
+    for channel in abfMemory.channelList:
+        assert np.array_equal(abfMapped.getAllYs(channel),
+                              abfMemory.getAllYs(channel))
+        for sweep in abfMemory.sweepList:
+            abfMemory.setSweep(sweep, channel)
+            abfMapped.setSweep(sweep, channel)
+            assert np.array_equal(abfMapped.sweepY, abfMemory.sweepY)
+            assert np.array_equal(abfMapped.sweepX, abfMemory.sweepX)
+
+
+def test_mmap_indexing():
+    abfPath = "data/abfs/14o16001_vc_pair_step.abf"
+    abfMemory = pyabf.ABF(abfPath)
+    abfMapped = pyabf.ABF(abfPath, dataMode="mmap")
+    assert len(abfMapped.data) == len(abfMemory.data)
+    assert np.array_equal(abfMapped.data[1, 100:200], abfMemory.data[1, 100:200])
+    assert np.array_equal(abfMapped.data[:, 100:200], abfMemory.data[:, 100:200])
+    assert np.array_equal(np.asarray(abfMapped.data), abfMemory.data)
+    assert abfMapped.data[1, 123] == abfMemory.data[1, 123]
+
+
+def test_mmap_isReadOnly():
+    abf = pyabf.ABF("data/abfs/14o16001_vc_pair_step.abf", dataMode="mmap")
+    with pytest.raises(TypeError):
+        abf.data[0] = 0
+
+
+def test_dataMode_mustBeKnown():
+    with pytest.raises(ValueError):
+        pyabf.ABF("data/abfs/14o16001_vc_pair_step.abf", dataMode="magic")
+
+
+@pytest.mark.parametrize("abfPath", allABFs)
+def test_lazySweeps_matchMemory(abfPath):
+    abfMemory = pyabf.ABF(abfPath)
+    abfLazy = pyabf.ABF(abfPath, loadData=False)
+    for channel in abfMemory.channelList:
+        for sweep in abfMemory.sweepList:
+            abfMemory.setSweep(sweep, channel)
+            abfLazy.setSweep(sweep, channel)
+            assert np.array_equal(abfLazy.sweepY, abfMemory.sweepY)
+            assert np.array_equal(abfLazy.sweepX, abfMemory.sweepX)
+
+    # reading individual sweeps must not load the whole data section
+    assert abfLazy._data is None
+    assert np.array_equal(abfLazy.data, abfMemory.data)
+
+
+@pytest.mark.parametrize("dataMode", ["memory", "mmap"])
+def test_channels_onlyRequestedAreDecoded(dataMode):
+    abfPath = "data/abfs/pclamp11_4ch.abf"
+    abfAll = pyabf.ABF(abfPath)
+    abf = pyabf.ABF(abfPath, channels=[3, 1], dataMode=dataMode)
+    assert abf.dataChannels == [1, 3]
+    assert abf.data.shape == (2, abfAll.data.shape[1])
+    for channel in abf.dataChannels:
+        assert np.array_equal(abf.getAllYs(channel), abfAll.getAllYs(channel))
+        for sweep in abf.sweepList:
+            abf.setSweep(sweep, channel)
+            abfAll.setSweep(sweep, channel)
+            assert np.array_equal(abf.sweepY, abfAll.sweepY)
+    with pytest.raises(ValueError):
+        abf.setSweep(0, 0)
+
+
+def test_channels_mustExist():
+    with pytest.raises(ValueError):
+        pyabf.ABF("data/abfs/pclamp11_4ch.abf", channels=[4])
+
+
+@pytest.mark.parametrize("dataMode", ["memory", "mmap"])
+def test_rawData_scalesToData(dataMode):
+    abf = pyabf.ABF("data/abfs/14o16001_vc_pair_step.abf", dataMode=dataMode)
+    raw = abf.getRawData()
+    assert raw.dtype == np.int16
+    for channel in abf.channelList:
+        scaled = pyabf.dataReader.scaleData(
+            raw[channel], abf.dataGain[channel], abf.dataOffset[channel])
+        assert np.allclose(scaled, abf.getAllYs(channel))
+
+
+def test_headerText_doesNotDecodeData(monkeypatch):
+    abf = pyabf.ABF("data/abfs/14o16001_vc_pair_step.abf")
+
+    def decodeFails(*args, **kwargs):
+        raise AssertionError("data was decoded to display the header")
+    monkeypatch.setattr(abf, "_decodePoints", decodeFails)
+    assert "abf.getRawData()" in abf.headerText
+
+
+@pytest.mark.parametrize("dataMode", ["memory", "mmap"])
+@pytest.mark.parametrize("dtype", [np.int16, np.float32, np.float64])
+def test_dtype_ofSweeps(dataMode, dtype):
+    abfPath = "data/abfs/14o16001_vc_pair_step.abf"
+    abfDefault = pyabf.ABF(abfPath)
+    abf = pyabf.ABF(abfPath, dataMode=dataMode, dtype=dtype)
+    abfLazy = pyabf.ABF(abfPath, loadData=False, dtype=dtype)
+    rawDefault = abfDefault.getRawData()
+    for channel in abf.channelList:
+        for sweep in abf.sweepList:
+            abf.setSweep(sweep, channel)
+            abfLazy.setSweep(sweep, channel)
+            abfDefault.setSweep(sweep, channel)
+            assert abf.sweepY.dtype == dtype
+            assert np.array_equal(abf.sweepY, abfLazy.sweepY)
+            if dtype == np.int16:
+                assert np.array_equal(abf.sweepY, rawDefault[channel,
+                    sweep*abf.sweepPointCount:(sweep+1)*abf.sweepPointCount])
+            else:
+                assert np.allclose(abf.sweepY, abfDefault.sweepY)
+
+
+def test_dtype_int16RequiresIntegerData():
+    with pytest.raises(ValueError):
+        pyabf.ABF("data/abfs/File_axon_7.abf", dtype=np.int16)
+
+
+@pytest.mark.parametrize("abfPath", allABFs)
+def test_data_isChannelMajor(abfPath):
+    abf = pyabf.ABF(abfPath)
+    assert abf.data.flags["C_CONTIGUOUS"]
+    assert abf.sweepY.flags["C_CONTIGUOUS"]
+
+
+@pytest.mark.parametrize("abfPath", allABFs)
+def test_decodeThreads_matchSingleThread(abfPath, monkeypatch):
+    abf = pyabf.ABF(abfPath)
+    monkeypatch.setattr(pyabf.dataReader, "CHUNK_POINT_COUNT", 1000)
+    abfThreaded = pyabf.ABF(abfPath, decodeThreads=4)
+    assert np.array_equal(abfThreaded.data, abf.data)
+
+
+@pytest.mark.skipif(not hasattr(os, "preadv"), reason="requires os.preadv")
+def test_decodeThreads_readFilesInParallel(monkeypatch):
+    abfPath = "data/abfs/14o16001_vc_pair_step.abf"
+    abf = pyabf.ABF(abfPath)
+    monkeypatch.setattr(pyabf.dataReader, "CHUNK_POINT_COUNT", 1000)
+    with open(abfPath, 'rb') as f:
+        def seekFails(*args):
+            raise AssertionError("threads shared the file position")
+        monkeypatch.setattr(f, "seek", seekFails, raising=False)
+        values = pyabf.dataReader.decodeData(
+            f, abf.dataByteStart, abf._dtype, abf.channelCount,
+            abf.data.shape[1], abf.dataChannels, abf._dataGain,
+            abf._dataOffset, threads=4)
+    assert np.array_equal(values, abf.data)
+
+
+@pytest.mark.parametrize("loadData", [True, False])
+def test_read_timeWindow(loadData):
+    abfPath = "data/abfs/16d22006_kim_gapfree.abf"
+    abfFull = pyabf.ABF(abfPath)
+    abf = pyabf.ABF(abfPath, loadData=loadData)
+    pt1, pt2 = int(1.5*abf.dataRate), int(3.25*abf.dataRate)
+    window = abf.read(1.5, 3.25)
+    assert window.shape == (abf.channelCount, pt2 - pt1)
+    assert np.array_equal(window, abfFull.data[:, pt1:pt2])
+    window = abf.read(1.5, 3.25, channels=[1])
+    assert np.array_equal(window[0], abfFull.getAllYs(1)[pt1:pt2])
+    assert abf.read(-1, 0.5).shape[1] == int(0.5*abf.dataRate)
+    assert abf.read(abf.dataLengthSec, abf.dataLengthSec + 1).shape[1] == 0
+    if not loadData:
+        assert abf._data is None
+
+
+def test_read_consecutiveWindowsCoverAllData():
+    abf = pyabf.ABF("data/abfs/16d22006_kim_gapfree.abf", loadData=False)
+    windows = [abf.read(t, t + 1.0) for t in range(int(abf.dataLengthSec) + 1)]
+    assert np.array_equal(np.hstack(windows), abf.data)
+
+
+def test_mmap_headerDescribesMappedData(capsys):
+    abf = pyabf.ABF("data/abfs/14o16001_vc_pair_step.abf", dataMode="mmap")
+    text = abf.headerText
+    assert "data = MappedData(2 channels, " in text
+    assert not "Unsure" in capsys.readouterr().out
@@ -0,0 +1,141 @@
+"""
+Tests related to sharing decoded ABF data between processes using shared memory.
+"""
+
+import sys
+import io
+import os
+import subprocess
+import time
+import pickle
+import concurrent.futures
+import pytest
+import numpy as np
+
+try:
+    # this ensures pyABF is imported from this specific path
+    sys.path.insert(0, "src")
+    import pyabf
+except:
+    raise ImportError("couldn't import local pyABF")
+
+
+ABF_PATH = "data/abfs/14o16001_vc_pair_step.abf"
+
+
+def sweepMeanFromHandle(handle, sweepNumber):
+    with handle.attach() as abf:
+        abf.setSweep(sweepNumber, 1)
+        return np.mean(abf.sweepY)
+
+
+@pytest.mark.parametrize("dataMode", ["memory", "mmap"])
+def test_sharedMemory_attachSharesData(dataMode):
+    abfDecoded = pyabf.ABF(ABF_PATH)
+    abf = pyabf.ABF(ABF_PATH, dataMode=dataMode)
+    handle = abf.toSharedMemory()
+    assert len(pickle.dumps(handle)) < 100_000
+    abfShared = pickle.loads(pickle.dumps(handle)).attach()
+    assert np.array_equal(abfShared.data, abfDecoded.data)
+    assert np.array_equal(abf.data, abfDecoded.data)
+    abfShared.setSweep(2, 1)
+    abfDecoded.setSweep(2, 1)
+    assert np.array_equal(abfShared.sweepY, abfDecoded.sweepY)
+
+    # values are shared (not copied) and read-only for attached ABFs
+    abf.data[0, 0] = 12345
+    assert abfShared.data[0, 0] == 12345
+    with pytest.raises(ValueError):
+        abfShared.data[0, 0] = 0
+
+    abfShared.close()
+    abf.close()
+    with pytest.raises(FileNotFoundError):
+        handle.attach()
+
+
+@pytest.mark.parametrize("source", [bytes, memoryview, io.BytesIO])
+def test_sharedMemory_handleOmitsSource(source):
+    with open(ABF_PATH, 'rb') as f:
+        abfBytes = f.read()
+    abf = pyabf.ABF(source(abfBytes))
+    with abf:
+        handle = abf.toSharedMemory()
+        assert len(pickle.dumps(handle)) < len(abfBytes) / 10
+        abfShared = handle.attach()
+        assert np.array_equal(abfShared.data, pyabf.ABF(ABF_PATH).data)
+        abfShared.setSweep(2, 1)
+        with pytest.raises(ValueError):
+            abfShared.md5
+        abfShared.close()
+
+
+def test_sharedMemory_processPool():
+    abf = pyabf.ABF(ABF_PATH)
+    with abf:
+        handle = abf.toSharedMemory()
+        with concurrent.futures.ProcessPoolExecutor(2) as pool:
+            means = list(pool.map(sweepMeanFromHandle, [handle]*abf.sweepCount,
+                                  abf.sweepList))
+        assert means == abf.mapSweeps(np.mean, 1)
+        assert np.array_equal(handle.attach().data, abf.data)
+
+
+SHARE_AND_ATTACH_IN_CHILD = """
+import sys
+import concurrent.futures
+sys.path.insert(0, "src")
+sys.path.insert(0, "tests")
+import pyabf
+from test_sharedData import sweepMeanFromHandle
+abf = pyabf.ABF("%s")
+handle = abf.toSharedMemory()
+with concurrent.futures.ProcessPoolExecutor(1) as pool:
+    pool.submit(sweepMeanFromHandle, handle, 0).result()
+print(handle.name)
+if %r:
+    abf.close()
+"""
+
+
+def sharedMemoryExists(name):
+    return os.path.exists(os.path.join("/dev/shm", name.lstrip("/")))
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="requires /dev/shm")
+@pytest.mark.parametrize("closeOwner", [True, False])
+def test_sharedMemory_attachingProcessesLeaveOwnerTracked(closeOwner):
+    result = subprocess.run([sys.executable, "-c", SHARE_AND_ATTACH_IN_CHILD % (ABF_PATH, closeOwner)],
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert not "KeyError" in result.stderr
+    assert not "Traceback" in result.stderr
+
+    # blocks of owners which exit without closing are removed by the resource tracker
+    name = result.stdout.strip()
+    for i in range(50):
+        if not sharedMemoryExists(name):
+            break
+        time.sleep(.1)
+    assert not sharedMemoryExists(name)
+
+
+def test_sharedMemory_attachDoesNotChangeResourceTracker(monkeypatch):
+    from multiprocessing import resource_tracker, shared_memory
+    abf = pyabf.ABF(ABF_PATH)
+    with abf:
+        handle = abf.toSharedMemory()
+
+        # other threads opening blocks while attaching must still be tracked
+        def registerFails(*args):
+            raise AssertionError("the attached block was registered")
+        monkeypatch.setattr(resource_tracker, "register", registerFails)
+        sharedMemoryInit = shared_memory.SharedMemory.__init__
+
+        def initWithTracker(self, *args, **kwargs):
+            assert resource_tracker.register is registerFails
+            sharedMemoryInit(self, *args, **kwargs)
+        monkeypatch.setattr(shared_memory.SharedMemory, "__init__", initWithTracker)
+
+        with handle.attach() as abfShared:
+            assert np.array_equal(abfShared.data, abf.data)
@@ -0,0 +1,292 @@
+"""
+Tests related to accessing sweep data in ways other than setSweep().
+Values must always match what setSweep() produces.
+"""
+
+import sys
+import pytest
+import numpy as np
+import glob
+
+try:
+    # this ensures pyABF is imported from this specific path
+    sys.path.insert(0, "src")
+    import pyabf
+    import pyabf.filter
+except:
+    raise ImportError("couldn't import local pyABF")
+
+
+allABFs = glob.glob("data/abfs/*.abf")
+
+
+def test_segment_isStridedView():
+    abf = pyabf.ABF("data/abfs/16d22006_kim_gapfree.abf")
+    segments = abf.segment(2.0, channel=1)
+    pointsPerSegment = 2 * abf.dataRate
+    assert segments.shape == (len(abf.data[1]) // pointsPerSegment,
+                              pointsPerSegment)
+    assert np.shares_memory(segments, abf.data)
+    for i, segment in enumerate(segments):
+        pt1 = i * pointsPerSegment
+        assert np.array_equal(segment, abf.data[1, pt1:pt1+pointsPerSegment])
+    with pytest.raises(ValueError):
+        segments[0, 0] = 0
+
+
+def test_segment_overlapping():
+    abf = pyabf.ABF("data/abfs/16d22006_kim_gapfree.abf")
+    segments = abf.segment(1.0, 0.25)
+    step = abf.dataRate // 4
+    assert np.array_equal(segments[3], abf.data[0, 3*step:3*step+abf.dataRate])
+    assert np.array_equal(segments[-1][-1],
+                          abf.data[0, (len(segments)-1)*step+abf.dataRate-1])
+
+
+def test_segment_mmapMatchesMemory():
+    abfPath = "data/abfs/16d22006_kim_gapfree.abf"
+    segments = pyabf.ABF(abfPath).segment(0.5)
+    assert np.array_equal(pyabf.ABF(abfPath, dataMode="mmap").segment(0.5),
+                          segments)
+
+
+def test_segment_longerThanData():
+    abf = pyabf.ABF("data/abfs/16d22006_kim_gapfree.abf")
+    assert abf.segment(abf.dataLengthSec * 2).shape[0] == 0
+
+
+@pytest.mark.parametrize("abfPath", allABFs)
+def test_sweepIndex_coversData(abfPath):
+    abf = pyabf.ABF(abfPath, loadData=False)
+    starts = abf._sweepPointStarts
+    counts = abf._sweepPointCounts
+    assert starts.dtype == np.int64 and counts.dtype == np.int64
+    assert len(starts) >= abf.sweepCount and len(counts) >= abf.sweepCount
+    assert starts[0] == 0
+    assert np.array_equal(starts[1:], np.cumsum(counts)[:-1])
+    if abf._fixedLengthSweeps:
+        assert np.all(counts == abf.sweepPointCount)
+    else:
+        assert np.sum(counts) == abf.dataPointCount // abf.channelCount
+
+
+def test_sweepIndex_variableLengthSweeps():
+    abf = pyabf.ABF("data/abfs/2020_06_16_0000.abf")
+    assert not abf._fixedLengthSweeps
+    lengths = abf._synchArraySection.lLength
+    for sweep in abf.sweepList:
+        abf.setSweep(sweep, absoluteTime=True)
+        assert len(abf.sweepY) == lengths[sweep]
+        assert abf.sweepX[0] == abf._synchArraySection.lStart[sweep] / abf.dataRate
+
+
+def test_epochTable_isCachedPerChannel():
+    abf = pyabf.ABF("data/abfs/2018_12_15_0000.abf")
+    abf.setSweep(0, 0)
+    epochTable = abf._getEpochTable(0)
+    for sweep in abf.sweepList:
+        abf.setSweep(sweep, 0)
+        assert abf.sweepEpochs is epochTable.epochWaveformsBySweep[sweep]
+    assert abf._getEpochTable(1) is not epochTable
+
+    # changing header values the table depends on rebuilds it
+    abf.holdingCommand[0] += 10
+    assert abf._getEpochTable(0) is not epochTable
+
+
+@pytest.mark.parametrize("abfPath", allABFs)
+def test_sweepView_matchesSetSweep(abfPath):
+    abf = pyabf.ABF(abfPath)
+    for channel in abf.channelList:
+        for sweepNumber in abf.sweepList:
+            abf.setSweep(0)
+            sweep = abf.sweep(sweepNumber, channel, absoluteTime=True)
+            assert abf.sweepNumber == 0 and abf.sweepChannel == 0
+            abf.setSweep(sweepNumber, channel, absoluteTime=True)
+            assert np.array_equal(sweep.y, abf.sweepY)
+            assert np.array_equal(sweep.x, abf.sweepX)
+            assert sweep.labelY == abf.sweepLabelY
+            assert sweep.unitsC == abf.sweepUnitsC
+            assert sweep.epochs is abf.sweepEpochs
+
+
+def test_sweepView_lazyWaveforms():
+    abf = pyabf.ABF("data/abfs/17o05026_vc_stim.abf")
+    sweep = abf.sweep(3)
+    abf.setSweep(3)
+    assert np.array_equal(sweep.c, abf.sweepC)
+    assert np.array_equal(sweep.d(4), abf.sweepD(4))
+    assert np.shares_memory(sweep.y, abf.data)
+
+
+def test_sweepView_isImmutable():
+    abf = pyabf.ABF("data/abfs/17o05026_vc_stim.abf")
+    sweep = abf.sweep(1)
+    with pytest.raises(AttributeError):
+        sweep.sweepNumber = 2
+    with pytest.raises(ValueError):
+        sweep.y[0] = 0
+    with pytest.raises(ValueError):
+        abf.sweep(abf.sweepCount)
+
+
+def test_sweepView_threads():
+    import concurrent.futures
+    abf = pyabf.ABF("data/abfs/17o05026_vc_stim.abf", loadData=False)
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        means = list(executor.map(lambda n: np.mean(abf.sweep(n).y),
+                                  abf.sweepList))
+    for sweepNumber in abf.sweepList:
+        abf.setSweep(sweepNumber)
+        assert means[sweepNumber] == np.mean(abf.sweepY)
+
+
+@pytest.mark.parametrize("loadData", [True, False])
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_iterSweeps_matchesSetSweep(loadData, prefetch):
+    abfPath = "data/abfs/2020_06_16_0000.abf"
+    abf = pyabf.ABF(abfPath)
+    abfIter = pyabf.ABF(abfPath, loadData=loadData)
+    sweepNumbers = []
+    for sweep in abfIter.iterSweeps(prefetch=prefetch):
+        abf.setSweep(sweep.sweepNumber)
+        assert np.array_equal(sweep.y, abf.sweepY)
+        sweepNumbers.append(sweep.sweepNumber)
+    assert sweepNumbers == abf.sweepList
+    assert abfIter._data is None or loadData
+
+
+def test_iterSweeps_stopEarly():
+    abf = pyabf.ABF("data/abfs/17o05026_vc_stim.abf", loadData=False)
+    sweeps = abf.iterSweeps(prefetch=4)
+    assert next(sweeps).sweepNumber == 0
+    assert next(sweeps).sweepNumber == 1
+    sweeps.close()
+
+
+def sweepMean(values):
+    return np.mean(values)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+@pytest.mark.parametrize("loadData", [True, False])
+def test_mapSweeps_matchesSetSweep(executor, loadData):
+    abfPath = "data/abfs/14o16001_vc_pair_step.abf"
+    abf = pyabf.ABF(abfPath)
+    abfMap = pyabf.ABF(abfPath, loadData=loadData)
+    for channel in abf.channelList:
+        means = abfMap.mapSweeps(sweepMean, channel, workers=2, executor=executor)
+        for sweepNumber in abf.sweepList:
+            abf.setSweep(sweepNumber, channel)
+            assert means[sweepNumber] == np.mean(abf.sweepY)
+
+
+def test_mapSweeps_multipleChannels():
+    abf = pyabf.ABF("data/abfs/14o16001_vc_pair_step.abf")
+    shapes = abf.mapSweeps(np.shape, workers=2)
+    assert shapes == [(abf.channelCount, abf.sweepPointCount)] * abf.sweepCount
+    sweeps = abf.mapSweeps(lambda values: values, [1, 0])
+    assert np.array_equal(sweeps[2][0], abf.getAllYs(1)[
+        2*abf.sweepPointCount:3*abf.sweepPointCount])
+
+
+def test_mapSweeps_processesCannotIgnoreModifiedData():
+    abfPath = "data/abfs/14o16001_vc_pair_step.abf"
+    abf = pyabf.ABF(abfPath)
+    pyabf.filter.gaussian(abf, 5)
+    with pytest.raises(ValueError):
+        abf.mapSweeps(sweepMean, 0, executor="process")
+    pyabf.filter.remove(abf)
+    assert abf.mapSweeps(sweepMean, 0, workers=2, executor="process") == \
+        abf.mapSweeps(sweepMean, 0)
+    abf.data = abf.data * 2
+    with pytest.raises(ValueError):
+        abf.mapSweeps(sweepMean, 0, executor="process")
+
+
+def test_mapSweeps_sharesLoadedData():
+    abf = pyabf.ABF("data/abfs/14o16001_vc_pair_step.abf")
+    sweeps = abf.mapSweeps(lambda values: values, 0)
+    assert all(np.shares_memory(sweep, abf.data) for sweep in sweeps)
+    with pytest.raises(ValueError):
+        abf.mapSweeps(sweepMean, executor="cluster")
+
+
+@pytest.mark.parametrize("abfPath", ["data/abfs/14o16001_vc_pair_step.abf",
+                                     "data/abfs/16d22006_kim_gapfree.abf"])
+def test_getSweeps_matchesSetSweep(abfPath):
+    abf = pyabf.ABF(abfPath)
+    for channel in abf.channelList:
+        sweeps = abf.getSweeps(channel=channel)
+        assert sweeps.shape == (abf.sweepCount, abf.sweepPointCount)
+        assert np.shares_memory(sweeps, abf.data)
+        for sweepNumber in abf.sweepList:
+            abf.setSweep(sweepNumber, channel)
+            assert np.array_equal(sweeps[sweepNumber], abf.sweepY)
+    lastSweep = abf.sweepCount - 1
+    assert np.array_equal(abf.getSweeps([lastSweep, 0])[0],
+                          abf.getSweeps()[lastSweep])
+
+
+def test_getSweeps_validation():
+    abf = pyabf.ABF("data/abfs/14o16001_vc_pair_step.abf")
+    with pytest.raises(ValueError):
+        abf.getSweeps([abf.sweepCount])
+    abf = pyabf.ABF("data/abfs/2020_06_16_0000.abf")
+    with pytest.raises(ValueError):
+        abf.getSweeps()
+
+
+@pytest.mark.parametrize("dataMode", ["memory", "mmap"])
+@pytest.mark.parametrize("loadData", [True, False])
+def test_sweepAllChannels_matchesSetSweep(dataMode, loadData):
+    abfPath = "data/abfs/14o16001_vc_pair_step.abf"
+    abf = pyabf.ABF(abfPath)
+    abfView = pyabf.ABF(abfPath, dataMode=dataMode, loadData=loadData)
+    for sweepNumber in abf.sweepList:
+        view = abfView.sweepAllChannels(sweepNumber)
+        assert view.channels == abf.channelList
+        assert view.y.shape == (abf.channelCount, abf.sweepPointCount)
+        for channel in abf.channelList:
+            abf.setSweep(sweepNumber, channel)
+            assert np.array_equal(view.y[channel], abf.sweepY)
+            assert view.unitsY[channel] == abf.sweepUnitsY
+            assert view.labelY[channel] == abf.sweepLabelY
+            assert view.labelC[channel] == abf.sweepLabelC
+        assert np.array_equal(view.x, abf.sweepX)
+
+
+def test_sweepAllChannels_isReadOnlyView():
+    abf = pyabf.ABF("data/abfs/14o16001_vc_pair_step.abf")
+    view = abf.sweepAllChannels(1)
+    assert np.shares_memory(view.y, abf.data)
+    with pytest.raises(ValueError):
+        view.y[0, 0] = 0
+    with pytest.raises(AttributeError):
+        view.sweepNumber = 2
+    with pytest.raises(ValueError):
+        abf.sweepAllChannels(abf.sweepCount)
+
+
+@pytest.mark.parametrize("abfPath", ["data/abfs/14o16001_vc_pair_step.abf",
+                                     "data/abfs/2020_06_16_0000.abf",
+                                     "data/abfs/16d22006_kim_gapfree.abf"])
+def test_locate_findsSweepPoints(abfPath):
+    abf = pyabf.ABF(abfPath)
+    times, expectedSweeps, expectedIndexes = [], [], []
+    for sweepNumber in abf.sweepList:
+        abf.setSweep(sweepNumber, absoluteTime=True)
+        indexes = np.linspace(0, len(abf.sweepX) - 1, 17).astype(int)
+        times.append(abf.sweepX[indexes])
+        expectedSweeps.append(np.full(len(indexes), sweepNumber))
+        expectedIndexes.append(indexes)
+    sweepNumbers, indexes = abf.locate(np.concatenate(times))
+    assert np.array_equal(sweepNumbers, np.concatenate(expectedSweeps))
+    assert np.array_equal(indexes, np.concatenate(expectedIndexes))
+
+
+def test_locate_singleTime():
+    abf = pyabf.ABF("data/abfs/14o16001_vc_pair_step.abf")
+    abf.setSweep(2, absoluteTime=True)
+    assert abf.locate(abf.sweepX[100]) == (2, 100)
+    assert abf.locate(-1)[0] == 0
@@ -0,0 +1,87 @@
+"""
+Tests related to TimeAxis objects which represent times of evenly spaced points
+without storing them. They must behave like the arrays they replace.
+"""
+
+import sys
+import pytest
+import numpy as np
+
+try:
+    # this ensures pyABF is imported from this specific path
+    sys.path.insert(0, "src")
+    import pyabf
+    from pyabf.timeAxis import TimeAxis
+except:
+    raise ImportError("couldn't import local pyABF")
+
+
+def test_timeAxis_matchesArray():
+    axis = TimeAxis(1000, 1/20000, 3.5)
+    values = np.arange(1000)*(1/20000) + 3.5
+    assert len(axis) == 1000
+    assert axis.shape == values.shape
+    assert np.array_equal(axis, values)
+    assert axis[0] == values[0] and axis[-1] == values[-1]
+    with pytest.raises(IndexError):
+        axis[1000]
+    assert axis.max() == values.max()
+    assert np.array_equal(axis[axis > 3.52], values[values > 3.52])
+
+
+@pytest.mark.parametrize("key", [slice(10, 20), slice(None, None, 7),
+                                 slice(-50, None, 3), slice(900, 10, -4),
+                                 slice(5, 5)])
+def test_timeAxis_slicesAreTimeAxes(key):
+    axis = TimeAxis(1000, 1/20000)
+    values = np.arange(1000)*(1/20000)
+    assert isinstance(axis[key], TimeAxis)
+    assert np.array_equal(axis[key], values[key])
+    assert np.array_equal(axis[key][1:], values[key][1:])
+
+
+def test_timeAxis_math():
+    axis = TimeAxis(100, 0.5)
+    values = np.arange(100)*0.5
+    assert isinstance(axis + 2, TimeAxis)
+    assert isinstance(2 + axis, TimeAxis)
+    assert np.array_equal(axis + 2, values + 2)
+    assert np.array_equal(axis - 2, values - 2)
+    assert np.array_equal(axis * 1000, values * 1000)
+    assert np.array_equal(axis + values, values * 2)
+    shifted = axis
+    shifted += 10
+    assert np.array_equal(shifted, values + 10)
+    assert np.array_equal(axis, values)
+    with pytest.raises(TypeError):
+        axis[0] = 1
+
+
+def test_timeAxis_timeIndexConversion():
+    axis = TimeAxis(1000, 0.25, 2)
+    assert axis.timeToIndex(2) == 0
+    assert axis.timeToIndex(3.01) == 4
+    assert axis.indexToTime(4) == 3
+    assert np.array_equal(axis.timeToIndex([2.5, 4.0]), [2, 8])
+    sliced = axis[100::2]
+    assert sliced.start == axis[100] and sliced.step == 0.5
+    assert sliced.timeToIndex(axis[104]) == 2
+
+
+def test_abf_sweepTimeAxis():
+    abf = pyabf.ABF("data/abfs/14o16001_vc_pair_step.abf")
+    abf.setSweep(3, absoluteTime=True)
+    assert isinstance(abf.sweepTimeAxis, TimeAxis)
+    assert isinstance(abf.sweepX, np.ndarray)
+    assert np.array_equal(abf.sweepTimeAxis, abf.sweepX)
+    assert abf.sweepTimeAxis.timeToIndex(abf.sweepX[123]) == 123
+    timeAxis = abf.getTimeAxis()
+    assert np.allclose(timeAxis, abf.getAllXs())
+    assert timeAxis.timeToIndex(abf.sweepX[0]) == 3*abf.sweepPointCount
+
+
+def test_abf_headerDescribesTimeAxis(capsys):
+    abf = pyabf.ABF("data/abfs/14o16001_vc_pair_step.abf")
+    assert "sweepTimeAxis = TimeAxis(start=" in abf.headerText
+    assert "sweepTimeAxis = `TimeAxis(start=" in abf.headerMarkdown
+    assert not "sweepTimeAxis" in capsys.readouterr().out